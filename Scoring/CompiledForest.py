@@ -0,0 +1,212 @@
+import os
+import sys
+import joblib
+import numpy as np
+
+# Rows traversed together; bounds the (rows x trees) working arrays
+CHUNK_ROWS = 4096
+
+
+class CompiledForest:
+    """
+    A fitted RandomForestClassifier flattened into a handful of contiguous arrays,
+    with a vectorized traversal that reproduces sklearn's predict and predict_proba
+    exactly. All trees live in one node table:
+
+        feature, threshold, left, right, missing_left   one entry per node
+        leaf_slot                                       node -> row of leaf_values
+        leaf_values                                     class probabilities per leaf
+        roots                                           first node of each tree
+
+    Traversal steps every (row, tree) pair down one level at a time and drops pairs
+    as soon as they reach a leaf.
+    """
+
+    ARRAYS = ("feature", "threshold", "left", "right", "missing_left", "leaf_slot", "leaf_values", "roots", "classes")
+
+    def __init__(self, feature, threshold, left, right, missing_left, leaf_slot, leaf_values, roots, classes, max_depth, n_features):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.missing_left = missing_left
+        self.leaf_slot = leaf_slot
+        self.leaf_values = leaf_values
+        self.roots = roots
+        self.classes = classes
+        self.max_depth = int(max_depth)
+        self.n_features = int(n_features)
+
+    @classmethod
+    def from_sklearn(cls, forest) -> "CompiledForest":
+        """
+        Flatten a fitted RandomForestClassifier.
+
+        Args:
+            forest: Fitted single-output RandomForestClassifier
+
+        Returns:
+            CompiledForest: Array-backed copy of the forest
+        """
+        if getattr(forest, "n_outputs_", 1) != 1:
+            raise ValueError("CompiledForest only supports single-output classifiers.")
+
+        features, thresholds, lefts, rights, missing, slots, values, roots = [], [], [], [], [], [], [], []
+        offset, n_leaves, max_depth = 0, 0, 0
+        for estimator in forest.estimators_:
+            tree = estimator.tree_
+            n = tree.node_count
+            is_leaf = tree.children_left == -1
+
+            features.append(np.where(is_leaf, 0, tree.feature).astype(np.int32))
+            thresholds.append(tree.threshold)
+            lefts.append(np.where(is_leaf, -1, tree.children_left + offset).astype(np.int32))
+            rights.append(np.where(is_leaf, -1, tree.children_right + offset).astype(np.int32))
+            missing.append(np.asarray(tree.missing_go_to_left, dtype=bool) & ~is_leaf)
+
+            slot = np.full(n, -1, dtype=np.int32)
+            slot[is_leaf] = np.arange(n_leaves, n_leaves + is_leaf.sum(), dtype=np.int32)
+            slots.append(slot)
+
+            # Same normalization as DecisionTreeClassifier.predict_proba
+            proba = tree.value[is_leaf, 0, :]
+            normalizer = proba.sum(axis=1, keepdims=True)
+            normalizer[normalizer == 0.0] = 1.0
+            values.append(proba / normalizer)
+
+            roots.append(offset)
+            offset += n
+            n_leaves += int(is_leaf.sum())
+            max_depth = max(max_depth, tree.max_depth)
+
+        return cls(
+            feature=np.concatenate(features),
+            threshold=np.concatenate(thresholds),
+            left=np.concatenate(lefts),
+            right=np.concatenate(rights),
+            missing_left=np.concatenate(missing),
+            leaf_slot=np.concatenate(slots),
+            leaf_values=np.concatenate(values),
+            roots=np.array(roots, dtype=np.int32),
+            classes=np.asarray(forest.classes_),
+            max_depth=max_depth,
+            n_features=forest.n_features_in_,
+        )
+
+    @property
+    def nbytes(self) -> int:
+        return sum(getattr(self, name).nbytes for name in self.ARRAYS)
+
+    def _leaves(self, X: np.ndarray) -> np.ndarray:
+        n_trees = len(self.roots)
+        node = np.tile(self.roots, len(X))
+        row = np.repeat(np.arange(len(X)), n_trees)
+        check_missing = np.isnan(X).any()
+        # Only (row, tree) pairs that have not reached a leaf take another step
+        active = np.flatnonzero(self.leaf_slot[node] < 0)
+        while active.size:
+            current = node[active]
+            x = X[row[active], self.feature[current]]
+            go_left = x <= self.threshold[current]
+            if check_missing:
+                go_left |= np.isnan(x) & self.missing_left[current]
+            current = np.where(go_left, self.left[current], self.right[current])
+            node[active] = current
+            active = active[self.leaf_slot[current] < 0]
+        return self.leaf_slot[node].reshape(len(X), n_trees)
+
+    def predict_proba(self, X) -> np.ndarray:
+        """
+        Class probabilities, averaged over trees.
+
+        Args:
+            X: 2D array of features (cast to float32, as sklearn does)
+
+        Returns:
+            array: (n_samples, n_classes) probabilities
+        """
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if X.shape[1] != self.n_features:
+            raise ValueError(f"X has {X.shape[1]} features, but CompiledForest is expecting {self.n_features} features as input.")
+
+        out = np.empty((len(X), len(self.classes)))
+        for start in range(0, len(X), CHUNK_ROWS):
+            chunk = X[start:start + CHUNK_ROWS]
+            per_tree = self.leaf_values[self._leaves(chunk)]
+            # Summing trees strictly in order keeps the float results identical to sklearn
+            out[start:start + len(chunk)] = np.cumsum(per_tree, axis=1)[:, -1] / len(self.roots)
+        return out
+
+    def predict(self, X) -> np.ndarray:
+        """
+        Predict labels for the provided features.
+
+        Args:
+            X: Features for prediction
+
+        Returns:
+            array: Predicted labels
+        """
+        return self.classes.take(np.argmax(self.predict_proba(X), axis=1))
+
+    def save(self, path: str) -> str:
+        """
+        Save the arrays (uncompressed, so load() can memory-map them).
+
+        Args:
+            path: Destination .joblib file
+
+        Returns:
+            str: The path written
+        """
+        payload = {name: getattr(self, name) for name in self.ARRAYS}
+        payload.update(max_depth=self.max_depth, n_features=self.n_features)
+        joblib.dump(payload, path)
+        return path
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> "CompiledForest":
+        """
+        Load a compiled forest, memory-mapping its arrays by default so several
+        processes serving the same model share one copy in the page cache.
+        """
+        return cls(**joblib.load(path, mmap_mode="r" if mmap else None))
+
+
+def verify(forest, compiled: CompiledForest, X) -> bool:
+    """
+    Check that a compiled forest reproduces sklearn exactly on X.
+
+    Args:
+        forest: The original fitted RandomForestClassifier
+        compiled: Its CompiledForest
+        X: Rows to compare on
+
+    Returns:
+        bool: True when predictions match and probabilities are bit-identical
+    """
+    return bool(
+        np.array_equal(forest.predict(X), compiled.predict(X))
+        and np.array_equal(forest.predict_proba(X), compiled.predict_proba(X))
+    )
+
+
+def compiled_path(model_path: str) -> str:
+    return os.path.splitext(model_path)[0] + ".compiled.joblib"
+
+
+if __name__ == "__main__":
+    # Export step: python CompiledForest.py models/scoring_model_<timestamp>.joblib
+    if len(sys.argv) != 2:
+        sys.exit("usage: python CompiledForest.py <scoring_model.joblib>")
+    model_path = sys.argv[1]
+    forest = joblib.load(model_path)
+    compiled = CompiledForest.from_sklearn(forest)
+
+    X_check = np.random.default_rng(0).normal(size=(1000, compiled.n_features))
+    if not verify(forest, compiled, X_check):
+        sys.exit("❌ Compiled forest does not match sklearn; not saving.")
+    out = compiled.save(compiled_path(model_path))
+    print(f"✅ Compiled {len(compiled.roots)} trees ({len(compiled.feature)} nodes, {compiled.nbytes / 1e6:.1f} MB) to {out}")
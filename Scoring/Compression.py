@@ -0,0 +1,177 @@
+import os
+import joblib
+import numpy as np
+from numpy.lib.format import open_memmap
+from sklearn.base import BaseEstimator, TransformerMixin
+from sklearn.decomposition import PCA
+from sklearn.random_projection import GaussianRandomProjection
+
+# Rows transformed at a time, so compressing a memory-mapped matrix stays bounded
+CHUNK_ROWS = 65536
+
+
+class EmbeddingCompressor(BaseEstimator, TransformerMixin):
+    """
+    Reduces embeddings before they are stored or fed to the scoring model:
+    an optional projection (PCA or Gaussian random projection) followed by optional
+    scalar quantization (float16, or int8 with one scale per output dimension).
+
+    encode() produces the compact stored form, decode() turns it back into float32,
+    and transform() does both, which is what the model trains and predicts on, so
+    training, serving and storage all see exactly the same numbers. It is an sklearn
+    transformer, so a cross-validated search can refit it inside every fold.
+    """
+
+    def __init__(self, method: str = "pca", n_components: int = 128, quantize: str = None,
+                 max_fit_rows: int = 20000, random_state: int = 42):
+        """
+        Args:
+            method: "pca", "random" or "none"
+            n_components: Output dimension of the projection
+            quantize: None, "float16" or "int8"
+            max_fit_rows: Rows sampled to fit the projection and quantization scales
+            random_state: Seed for sampling and the projection
+        """
+        if method not in ("pca", "random", "none"):
+            raise ValueError(f"Unknown compression method '{method}'")
+        if quantize not in (None, "float16", "int8"):
+            raise ValueError(f"Unknown quantization '{quantize}'")
+        self.method = method
+        self.n_components = n_components
+        self.quantize = quantize
+        self.max_fit_rows = max_fit_rows
+        self.random_state = random_state
+        self.projection = None
+        self.scale = None
+
+    @classmethod
+    def from_spec(cls, spec: str) -> "EmbeddingCompressor":
+        """Build from a short spec such as "pca:128", "random:256:int8" or "none:0:float16"."""
+        parts = spec.split(":")
+        return cls(method=parts[0], n_components=int(parts[1]) if len(parts) > 1 else 128,
+                   quantize=parts[2] if len(parts) > 2 else None)
+
+    @property
+    def name(self) -> str:
+        name = "raw" if self.method == "none" else f"{self.method}{self.n_components}"
+        return f"{name}+{self.quantize}" if self.quantize else name
+
+    def fit(self, X, y=None) -> "EmbeddingCompressor":
+        """
+        Fit the projection and quantization scales on (a sample of) X.
+
+        Args:
+            X: Embeddings, one row per vector
+            y: Ignored
+
+        Returns:
+            EmbeddingCompressor: self
+        """
+        rng = np.random.default_rng(self.random_state)
+        rows = np.sort(rng.choice(len(X), self.max_fit_rows, replace=False)) if len(X) > self.max_fit_rows else slice(None)
+        sample = np.asarray(X[rows], dtype=np.float32)
+
+        if self.method == "pca":
+            self.projection = PCA(n_components=self.n_components, random_state=self.random_state).fit(sample)
+        elif self.method == "random":
+            self.projection = GaussianRandomProjection(n_components=self.n_components, random_state=self.random_state).fit(sample)
+
+        if self.quantize == "int8":
+            projected = self._project(sample)
+            # Symmetric per-dimension scale; the top 0.1% is clipped rather than stretching the range
+            bound = np.percentile(np.abs(projected), 99.9, axis=0)
+            self.scale = np.where(bound > 0, bound / 127.0, 1.0).astype(np.float32)
+        return self
+
+    def _project(self, X) -> np.ndarray:
+        X = np.asarray(X, dtype=np.float32)
+        if self.projection is None:
+            return X
+        return self.projection.transform(X).astype(np.float32)
+
+    def encode(self, X) -> np.ndarray:
+        """
+        Compress embeddings to their stored form.
+
+        Args:
+            X: Embeddings, one row per vector
+
+        Returns:
+            array: float32, float16 or int8 codes
+        """
+        projected = self._project(X)
+        if self.quantize == "float16":
+            return projected.astype(np.float16)
+        if self.quantize == "int8":
+            return np.clip(np.rint(projected / self.scale), -127, 127).astype(np.int8)
+        return projected
+
+    def decode(self, codes) -> np.ndarray:
+        """Turn stored codes back into float32 features."""
+        if self.quantize == "int8":
+            return codes.astype(np.float32) * self.scale
+        return np.asarray(codes, dtype=np.float32)
+
+    def transform(self, X) -> np.ndarray:
+        """
+        Features the model sees: encode then decode, a chunk at a time.
+
+        Args:
+            X: Embeddings, one row per vector
+
+        Returns:
+            array: float32 features
+        """
+        if len(X) <= CHUNK_ROWS:
+            return self.decode(self.encode(X))
+        return np.concatenate([self.decode(self.encode(X[i:i + CHUNK_ROWS])) for i in range(0, len(X), CHUNK_ROWS)])
+
+    def encode_file(self, X, path: str) -> np.ndarray:
+        """
+        Encode X into an .npy file chunk by chunk, for compressed local storage.
+
+        Returns:
+            array: The codes, memory-mapped from `path`
+        """
+        width = self.n_components if self.projection is not None else X.shape[1]
+        dtype = {"float16": np.float16, "int8": np.int8}.get(self.quantize, np.float32)
+        codes = open_memmap(path, mode="w+", dtype=dtype, shape=(len(X), width))
+        for start in range(0, len(X), CHUNK_ROWS):
+            codes[start:start + CHUNK_ROWS] = self.encode(X[start:start + CHUNK_ROWS])
+        codes.flush()
+        return codes
+
+    def bytes_per_vector(self, dim: int) -> int:
+        width = self.n_components if self.method != "none" else dim
+        return width * {"float16": 2, "int8": 1}.get(self.quantize, 4)
+
+    def save(self, path: str) -> str:
+        joblib.dump(self, path)
+        return path
+
+    @staticmethod
+    def load(path: str) -> "EmbeddingCompressor":
+        return joblib.load(path)
+
+
+def compressor_path(model_path: str) -> str:
+    return os.path.splitext(model_path)[0] + ".compressor.joblib"
+
+
+class CompressedModel:
+    """A model trained on compressed features, served on raw embeddings."""
+
+    def __init__(self, compressor: EmbeddingCompressor, model):
+        self.compressor = compressor
+        self.model = model
+
+    @property
+    def n_features_in_(self):
+        # Raw embedding width when the projection knows it
+        return getattr(self.compressor.projection, "n_features_in_", getattr(self.model, "n_features_in_", None))
+
+    def predict(self, X):
+        return self.model.predict(self.compressor.transform(np.atleast_2d(X)))
+
+    def predict_proba(self, X):
+        return self.model.predict_proba(self.compressor.transform(np.atleast_2d(X)))
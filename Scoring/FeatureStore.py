@@ -0,0 +1,274 @@
+import ast
+import csv
+import json
+import math
+import os
+import sys
+import numpy as np
+from numpy.lib.format import open_memmap
+
+FEATURES_DIR = os.path.join(os.path.dirname(__file__), "features")
+VECTORS_CSV = os.path.join(os.path.dirname(__file__), "embedding", "vectors_output.csv")
+
+# Rows added per growth step are at least this many, and at least the current capacity
+MIN_GROWTH = 1024
+SYNC_BATCH_ROWS = 1000
+
+
+def _label(metadata: dict, label_field: str) -> float:
+    value = (metadata or {}).get(label_field)
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        # Missing or non-numeric (e.g. a free-text evaluation) -> unlabeled
+        return math.nan
+
+
+class FeatureStore:
+    """
+    Embeddings on local disk, laid out for training and batch scoring:
+
+        features.npy   float32 (capacity x dim) matrix, memory-mapped
+        labels.npy     float64 label per row, NaN when unlabeled
+        live.npy       False for deleted (tombstoned) rows
+        ids.jsonl      id of every row, in row order (append-only)
+        index.json     dimension and used row count
+
+    Rows are appended and overwritten in place; deleting only flips the tombstone,
+    and compact() rewrites the files without dead rows. Readers get views onto the
+    memory map, so loading a dataset costs page faults, not a copy.
+    """
+
+    def __init__(self, directory: str = FEATURES_DIR, dim: int = None):
+        self.directory = directory
+        self.index_path = os.path.join(directory, "index.json")
+        self.ids_path = os.path.join(directory, "ids.jsonl")
+        if os.path.exists(self.index_path):
+            with open(self.index_path) as f:
+                index = json.load(f)
+            self.dim, self.rows, self._ids_bytes = index["dim"], index["rows"], index["ids_bytes"]
+            with open(self.ids_path, "rb") as f:
+                # Bytes past ids_bytes belong to an upsert that never committed
+                self.ids = [json.loads(line) for line in f.read(self._ids_bytes).splitlines()]
+        else:
+            self.dim, self.rows, self.ids, self._ids_bytes = dim, 0, [], 0
+        self._ids_written = self.rows
+        self.row_of = {vid: row for row, vid in enumerate(self.ids)}
+        self._X = self._labels = self._live = None
+        if self.dim is not None and os.path.exists(self._path("features")):
+            self._open()
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, f"{name}.npy")
+
+    def _open(self):
+        self._X = np.load(self._path("features"), mmap_mode="r+")
+        self._labels = np.load(self._path("labels"), mmap_mode="r+")
+        self._live = np.load(self._path("live"), mmap_mode="r+")
+
+    @property
+    def capacity(self) -> int:
+        return 0 if self._X is None else len(self._X)
+
+    def __len__(self) -> int:
+        """Number of live rows."""
+        return 0 if self._live is None else int(np.count_nonzero(self._live[:self.rows]))
+
+    def _allocate(self, capacity: int):
+        """Grow (or create) the arrays to `capacity` rows, copying existing rows across in chunks."""
+        os.makedirs(self.directory, exist_ok=True)
+        for name, dtype, shape, fill in (
+            ("features", np.float32, (capacity, self.dim), 0.0),
+            ("labels", np.float64, (capacity,), np.nan),
+            ("live", np.bool_, (capacity,), False),
+        ):
+            tmp = os.path.join(self.directory, f".{name}.npy")
+            grown = open_memmap(tmp, mode="w+", dtype=dtype, shape=shape)
+            old = {"features": self._X, "labels": self._labels, "live": self._live}[name]
+            for start in range(0, self.rows, 65536):
+                end = min(start + 65536, self.rows)
+                grown[start:end] = old[start:end]
+            grown[self.rows:] = fill
+            grown.flush()
+            del grown
+            os.replace(tmp, self._path(name))
+        self._open()
+
+    def _write_index(self):
+        for array in (self._X, self._labels, self._live):
+            array.flush()
+        if self._ids_written < self.rows:
+            with open(self.ids_path, "r+b" if os.path.exists(self.ids_path) else "wb") as f:
+                # Overwrite anything an interrupted upsert left past the committed ids
+                f.seek(self._ids_bytes)
+                f.truncate()
+                f.writelines((json.dumps(vid) + "\n").encode() for vid in self.ids[self._ids_written:self.rows])
+                self._ids_bytes = f.tell()
+            self._ids_written = self.rows
+        # The row count is committed last; a crash before this leaves the old store intact
+        tmp = self.index_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({"dim": self.dim, "rows": self.rows, "ids_bytes": self._ids_bytes}, f)
+        os.replace(tmp, self.index_path)
+
+    def upsert(self, ids, vectors, labels=None):
+        """
+        Add rows, or overwrite the rows that already exist for these ids.
+
+        Args:
+            ids: Vector ids
+            vectors: Embeddings, one row per id
+            labels: Labels (NaN for unlabeled), one per id; None leaves labels unset
+        """
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if len(ids) == 0:
+            return
+        if vectors.ndim != 2 or len(vectors) != len(ids):
+            raise ValueError("vectors must be a 2D array with one row per id")
+        if self.dim is None:
+            self.dim = vectors.shape[1]
+        if vectors.shape[1] != self.dim:
+            raise ValueError(f"Expected {self.dim}-dimensional vectors, got {vectors.shape[1]}")
+
+        rows = np.empty(len(ids), dtype=np.int64)
+        new = 0
+        for i, vid in enumerate(ids):
+            row = self.row_of.get(vid)
+            if row is None:
+                row = self.row_of[vid] = self.rows + new
+                self.ids.append(vid)
+                new += 1
+            rows[i] = row
+        if self.rows + new > self.capacity:
+            self._allocate(max(self.rows + new, self.capacity + max(self.capacity, MIN_GROWTH)))
+        self.rows += new
+
+        self._X[rows] = vectors
+        self._live[rows] = True
+        if labels is not None:
+            self._labels[rows] = np.asarray(labels, dtype=np.float64)
+        self._write_index()
+
+    def delete(self, ids):
+        """Tombstone rows; their ids can be upserted again later."""
+        rows = [self.row_of[vid] for vid in ids if vid in self.row_of]
+        if rows:
+            self._live[rows] = False
+            self._write_index()
+
+    def compact(self):
+        """Rewrite the store without tombstoned rows, so training_set() can return views again."""
+        if self.rows == len(self):
+            return
+        keep = np.flatnonzero(self._live[:self.rows])
+        ids = [self.ids[row] for row in keep]
+        tmp = FeatureStore(self.directory + ".compact", dim=self.dim)
+        for start in range(0, len(keep), 65536):
+            chunk = keep[start:start + 65536]
+            tmp.upsert(ids[start:start + 65536], self._X[chunk], self._labels[chunk])
+        del self._X, self._labels, self._live
+        for name in ("features", "labels", "live"):
+            os.replace(tmp._path(name), self._path(name))
+        os.replace(tmp.ids_path, self.ids_path)
+        os.replace(tmp.index_path, self.index_path)
+        os.rmdir(tmp.directory)
+        self.__init__(self.directory)
+
+    def get(self, ids) -> np.ndarray:
+        """Embeddings for the given ids (a copy, since the rows are not contiguous)."""
+        return np.array(self._X[[self.row_of[vid] for vid in ids]])
+
+    def training_set(self):
+        """
+        Live, labeled rows for training.
+
+        Returns:
+            tuple: ids, X, y. X and y are views onto the memory map when every row is
+                live and labeled; otherwise the selected rows are copied
+                (call compact() first to avoid that).
+        """
+        if self._X is None:
+            return [], np.empty((0, self.dim or 0), dtype=np.float32), np.empty(0)
+        labels = self._labels[:self.rows]
+        live = self._live[:self.rows]
+        unlabeled = np.flatnonzero(live & np.isnan(labels))
+        if len(unlabeled):
+            print(f"⚠️ {len(unlabeled)} vectors have no numeric label and are left out of training, "
+                  f"e.g. {[self.ids[row] for row in unlabeled[:5]]}")
+        usable = live & ~np.isnan(labels)
+        if usable.all():
+            return self.ids[:self.rows], self._X[:self.rows], labels
+        rows = np.flatnonzero(usable)
+        return [self.ids[row] for row in rows], self._X[rows], labels[rows]
+
+    def iter_batches(self, batch_rows: int = 50000):
+        """
+        Yield (ids, X) for live rows, batch_rows at a time, as views onto the
+        memory map, so batch scoring uses bounded memory whatever the store size.
+        """
+        for start in range(0, self.rows, batch_rows):
+            end = min(start + batch_rows, self.rows)
+            live = self._live[start:end]
+            if live.all():
+                yield self.ids[start:end], self._X[start:end]
+            elif live.any():
+                rows = np.flatnonzero(live)
+                yield [self.ids[start + row] for row in rows], self._X[start:end][rows]
+
+    def sync_csv(self, path: str = VECTORS_CSV, label_field: str = "eval_score") -> int:
+        """
+        Load vectors written by the embedding pipeline (`id,values,metadata` rows).
+
+        Args:
+            path: vectors_output.csv
+            label_field: Metadata field holding the label
+
+        Returns:
+            int: Rows synced
+        """
+        synced = 0
+        csv.field_size_limit(sys.maxsize)
+        with open(path, newline="", encoding="utf-8") as f:
+            batch = []
+            for row in csv.DictReader(f):
+                if not row.get("values"):
+                    continue
+                metadata = ast.literal_eval(row["metadata"]) if row.get("metadata") else {}
+                batch.append((row["id"], ast.literal_eval(row["values"]), _label(metadata, label_field)))
+                if len(batch) >= SYNC_BATCH_ROWS:
+                    synced += self._upsert_batch(batch)
+                    batch = []
+            synced += self._upsert_batch(batch)
+        return synced
+
+    def sync_rag(self, rag_storage, ids: list = None, label_field: str = "eval_score") -> int:
+        """
+        Load vectors from a RAGStorage index, streaming them with
+        RAGStorage.iter_vectors() so memory stays flat however large the namespace is.
+
+        Args:
+            rag_storage: RAGStorage to read from
+            ids: Only these vector ids (default: every vector in the namespace)
+            label_field: Metadata field holding the label
+
+        Returns:
+            int: Rows synced
+        """
+        synced = 0
+        batch = []
+        for vector in rag_storage.iter_vectors(ids=ids):
+            if vector["values"] is None or len(vector["values"]) == 0:
+                continue
+            batch.append((vector["id"], vector["values"], _label(vector["metadata"], label_field)))
+            if len(batch) >= SYNC_BATCH_ROWS:
+                synced += self._upsert_batch(batch)
+                batch = []
+        synced += self._upsert_batch(batch)
+        return synced
+
+    def _upsert_batch(self, batch: list) -> int:
+        if not batch:
+            return 0
+        ids, vectors, labels = zip(*batch)
+        self.upsert(list(ids), np.array(vectors, dtype=np.float32), np.array(labels))
+        return len(batch)
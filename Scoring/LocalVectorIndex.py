@@ -0,0 +1,465 @@
+import json
+import os
+import threading
+import numpy as np
+from numpy.lib.format import open_memmap
+from scipy.sparse import csr_matrix
+
+LOCAL_INDEX_DIR = os.path.join(os.path.dirname(__file__), "vector_index")
+DEFAULT_NAMESPACE_DIR = "__default__"
+
+# Rows added per growth step are at least this many, and at least the current capacity
+MIN_GROWTH = 1024
+SCAN_ROWS = 65536
+# Most rows sampled to train the IVF centroids
+IVF_SAMPLE_ROWS = 50000
+
+
+class _Response(dict):
+    """Dict that also allows attribute access, like the Pinecone client's responses."""
+
+    def __getattr__(self, name):
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name)
+
+
+_COMPARISONS = {
+    "$eq": lambda value, operand: value == operand,
+    "$ne": lambda value, operand: value != operand,
+    "$gt": lambda value, operand: value is not None and value > operand,
+    "$gte": lambda value, operand: value is not None and value >= operand,
+    "$lt": lambda value, operand: value is not None and value < operand,
+    "$lte": lambda value, operand: value is not None and value <= operand,
+    "$in": lambda value, operand: value in operand,
+    "$nin": lambda value, operand: value not in operand,
+    "$exists": lambda value, operand: (value is not None) == operand,
+}
+
+
+def matches_filter(metadata: dict, filter: dict) -> bool:
+    """
+    Whether metadata satisfies a Pinecone metadata filter: {"field": value},
+    {"field": {"$op": operand}} with the operators in _COMPARISONS, "$and" and "$or".
+    """
+    metadata = metadata or {}
+    for key, condition in filter.items():
+        if key == "$and":
+            if not all(matches_filter(metadata, part) for part in condition):
+                return False
+        elif key == "$or":
+            if not any(matches_filter(metadata, part) for part in condition):
+                return False
+        elif isinstance(condition, dict):
+            for op, operand in condition.items():
+                if op not in _COMPARISONS:
+                    raise ValueError(f"Unsupported filter operator '{op}'")
+                try:
+                    if not _COMPARISONS[op](metadata.get(key), operand):
+                        return False
+                except TypeError:
+                    # Comparing across types (e.g. a string with $gt) never matches
+                    return False
+        elif metadata.get(key) != condition:
+            return False
+    return True
+
+
+class _Namespace:
+    """
+    One namespace on local disk:
+
+        vectors.npy    float32 (capacity x dim) matrix, memory-mapped
+        norms.npy      L2 norm of every row, for cosine scores
+        live.npy       False for deleted rows
+        records.jsonl  {"row", "id", "metadata"} per write (append-only; the last line for a row wins)
+        index.json     dimension, used row count and committed records.jsonl bytes
+        ivf.npz        optional inverted-file index: centroids and rows grouped by centroid
+        ivf_vectors.npy  normalized copy of the indexed rows in list order, so a probe reads contiguous blocks
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.index_path = os.path.join(directory, "index.json")
+        self.records_path = os.path.join(directory, "records.jsonl")
+        self.ivf_path = os.path.join(directory, "ivf.npz")
+        self.ivf_vectors_path = os.path.join(directory, "ivf_vectors.npy")
+        self.lock = threading.Lock()
+        self.dim, self.rows, self._records_bytes = None, 0, 0
+        self.ids, self.metadata = [], []
+        if os.path.exists(self.index_path):
+            with open(self.index_path) as f:
+                index = json.load(f)
+            self.dim, self.rows, self._records_bytes = index["dim"], index["rows"], index["records_bytes"]
+            self.ids, self.metadata = [None] * self.rows, [None] * self.rows
+            with open(self.records_path, "rb") as f:
+                # Bytes past records_bytes belong to an upsert that never committed
+                for line in f.read(self._records_bytes).splitlines():
+                    record = json.loads(line)
+                    self.ids[record["row"]] = record["id"]
+                    self.metadata[record["row"]] = record["metadata"]
+        self.row_of = {vid: row for row, vid in enumerate(self.ids)}
+        self._X = self._norms = self._live = None
+        if self.dim is not None:
+            self._open()
+        self._load_ivf()
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, f"{name}.npy")
+
+    def _open(self):
+        self._X = np.load(self._path("vectors"), mmap_mode="r+")
+        self._norms = np.load(self._path("norms"), mmap_mode="r+")
+        self._live = np.load(self._path("live"), mmap_mode="r+")
+
+    def _load_ivf(self):
+        self.ivf = None
+        if os.path.exists(self.ivf_path):
+            with np.load(self.ivf_path) as ivf:
+                self.ivf = {name: ivf[name] for name in ivf.files}
+            self.ivf["vectors"] = np.load(self.ivf_vectors_path, mmap_mode="r")
+
+    @property
+    def capacity(self) -> int:
+        return 0 if self._X is None else len(self._X)
+
+    def __len__(self) -> int:
+        return 0 if self._live is None else int(np.count_nonzero(self._live[:self.rows]))
+
+    def _allocate(self, capacity: int):
+        os.makedirs(self.directory, exist_ok=True)
+        for name, dtype, shape, fill in (
+            ("vectors", np.float32, (capacity, self.dim), 0.0),
+            ("norms", np.float32, (capacity,), 0.0),
+            ("live", np.bool_, (capacity,), False),
+        ):
+            tmp = os.path.join(self.directory, f".{name}.npy")
+            grown = open_memmap(tmp, mode="w+", dtype=dtype, shape=shape)
+            old = {"vectors": self._X, "norms": self._norms, "live": self._live}[name]
+            for start in range(0, self.rows, SCAN_ROWS):
+                end = min(start + SCAN_ROWS, self.rows)
+                grown[start:end] = old[start:end]
+            grown[self.rows:] = fill
+            grown.flush()
+            del grown
+            os.replace(tmp, self._path(name))
+        self._open()
+
+    def _commit(self, records: list):
+        for array in (self._X, self._norms, self._live):
+            array.flush()
+        if records:
+            with open(self.records_path, "r+b" if os.path.exists(self.records_path) else "wb") as f:
+                # Overwrite anything an interrupted upsert left past the committed records
+                f.seek(self._records_bytes)
+                f.truncate()
+                f.writelines((json.dumps(record) + "\n").encode() for record in records)
+                self._records_bytes = f.tell()
+        # The row count is committed last; a crash before this leaves the old namespace intact
+        tmp = self.index_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({"dim": self.dim, "rows": self.rows, "records_bytes": self._records_bytes}, f)
+        os.replace(tmp, self.index_path)
+
+    def upsert(self, ids: list, vectors, metadata: list):
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if vectors.ndim != 2 or len(vectors) != len(ids):
+            raise ValueError("vectors must be a 2D array with one row per id")
+        if self.dim is None:
+            self.dim = vectors.shape[1]
+        if vectors.shape[1] != self.dim:
+            raise ValueError(f"Expected {self.dim}-dimensional vectors, got {vectors.shape[1]}")
+
+        rows = np.empty(len(ids), dtype=np.int64)
+        new = 0
+        for i, vid in enumerate(ids):
+            row = self.row_of.get(vid)
+            if row is None:
+                row = self.row_of[vid] = self.rows + new
+                self.ids.append(vid)
+                self.metadata.append(None)
+                new += 1
+            rows[i] = row
+        if self.rows + new > self.capacity:
+            self._allocate(max(self.rows + new, self.capacity + max(self.capacity, MIN_GROWTH)))
+        if self.ivf is not None and rows.min(initial=self.rows) < self.ivf["built_rows"]:
+            # An indexed row changed lists; search exactly until build_ivf() runs again
+            self.drop_ivf()
+        self.rows += new
+
+        self._X[rows] = vectors
+        self._norms[rows] = np.linalg.norm(vectors, axis=1)
+        self._live[rows] = True
+        for row, meta in zip(rows.tolist(), metadata):
+            self.metadata[row] = meta
+        self._commit([{"row": row, "id": self.ids[row], "metadata": self.metadata[row]} for row in rows.tolist()])
+
+    def delete(self, ids: list):
+        rows = [self.row_of[vid] for vid in ids if vid in self.row_of]
+        if rows:
+            self._live[rows] = False
+            self._commit([])
+
+    def live_ids(self) -> list:
+        if self._live is None:
+            return []
+        return [self.ids[row] for row in np.flatnonzero(self._live[:self.rows])]
+
+    def _top(self, rows: np.ndarray, scores: np.ndarray, top_k: int):
+        if len(scores) > top_k:
+            keep = np.argpartition(-scores, top_k - 1)[:top_k]
+            rows, scores = rows[keep], scores[keep]
+        order = np.argsort(-scores, kind="stable")
+        return rows[order], scores[order]
+
+    def _scores(self, rows, q: np.ndarray) -> np.ndarray:
+        norms = self._norms[rows]
+        dots = self._X[rows] @ q
+        return np.divide(dots, norms, out=np.zeros_like(dots), where=norms > 0)
+
+    def search(self, vector, top_k: int, n_probe: int = None, filter: dict = None):
+        """
+        Cosine top_k over live rows: exact by default, through the IVF index when
+        one is built (rows added after the build are always scanned exactly).
+        With a metadata filter, only rows whose metadata matches are considered.
+
+        Returns:
+            tuple: rows, scores (best first)
+        """
+        if self._X is None or self.rows == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        q = np.asarray(vector, dtype=np.float32)
+        q_norm = np.linalg.norm(q)
+        q = q / q_norm if q_norm > 0 else q
+        allowed = np.array(self._live[:self.rows])
+        if filter:
+            allowed &= np.fromiter((matches_filter(meta, filter) for meta in self.metadata[:self.rows]),
+                                   dtype=bool, count=self.rows)
+
+        if self.ivf is not None:
+            built = int(self.ivf["built_rows"])
+            centroids, order, offsets = self.ivf["centroids"], self.ivf["order"], self.ivf["offsets"]
+            n_probe = min(n_probe or int(self.ivf["n_probe"]), len(centroids))
+            lists = np.argpartition(-(centroids @ q), n_probe - 1)[:n_probe]
+            blocks = [(offsets[l], offsets[l + 1]) for l in lists if offsets[l] < offsets[l + 1]]
+            rows = [order[start:end] for start, end in blocks]
+            scores = [self.ivf["vectors"][start:end] @ q for start, end in blocks]
+            # Rows added since the build are scored directly
+            rows.append(np.arange(built, self.rows))
+            scores.append(self._scores(slice(built, self.rows), q))
+            rows, scores = np.concatenate(rows), np.concatenate(scores)
+            keep = allowed[rows]
+            return self._top(rows[keep], scores[keep], top_k)
+
+        best_rows, best_scores = np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        for start in range(0, self.rows, SCAN_ROWS):
+            end = min(start + SCAN_ROWS, self.rows)
+            rows = start + np.flatnonzero(allowed[start:end])
+            scores = self._scores(slice(start, end), q)[rows - start]
+            best_rows, best_scores = self._top(
+                np.concatenate([best_rows, rows]), np.concatenate([best_scores, scores]), top_k
+            )
+        return best_rows, best_scores
+
+    def build_ivf(self, n_lists: int = None, n_probe: int = None, iterations: int = 10, random_state: int = 42):
+        """Cluster the (normalized) rows with spherical k-means and group row numbers by nearest centroid."""
+        live = np.flatnonzero(self._live[:self.rows])
+        if len(live) == 0:
+            return
+        n_lists = min(n_lists or max(1, int(np.sqrt(len(live)))), len(live))
+        n_probe = n_probe or max(1, n_lists // 8)
+        rng = np.random.default_rng(random_state)
+        sample = np.sort(rng.choice(live, min(len(live), IVF_SAMPLE_ROWS), replace=False))
+        unit = self._X[sample] / np.maximum(self._norms[sample], 1e-12)[:, None]
+        centroids = unit[rng.choice(len(unit), n_lists, replace=False)]
+        for _ in range(iterations):
+            nearest = np.argmax(unit @ centroids.T, axis=1)
+            # Sum of the rows assigned to each list, as a sparse one-hot product
+            sums = np.asarray(csr_matrix(
+                (np.ones(len(unit), dtype=np.float32), (nearest, np.arange(len(unit)))), shape=(n_lists, len(unit))
+            ) @ unit)
+            empty = ~np.any(sums, axis=1)
+            # Empty lists are reseeded from random sample rows
+            sums[empty] = unit[rng.choice(len(unit), int(empty.sum()), replace=False)]
+            centroids = sums / np.maximum(np.linalg.norm(sums, axis=1, keepdims=True), 1e-12)
+
+        assignment = np.empty(self.rows, dtype=np.int32)
+        for start in range(0, self.rows, SCAN_ROWS):
+            end = min(start + SCAN_ROWS, self.rows)
+            assignment[start:end] = np.argmax(self._X[start:end] @ centroids.T, axis=1)
+        order = np.argsort(assignment, kind="stable").astype(np.int64)
+        offsets = np.searchsorted(assignment[order], np.arange(n_lists + 1))
+        vectors = open_memmap(self.ivf_vectors_path + ".tmp", mode="w+", dtype=np.float32, shape=(self.rows, self.dim))
+        for start in range(0, self.rows, SCAN_ROWS):
+            rows = order[start:start + SCAN_ROWS]
+            vectors[start:start + len(rows)] = self._X[rows] / np.maximum(self._norms[rows], 1e-12)[:, None]
+        vectors.flush()
+        del vectors
+        os.replace(self.ivf_vectors_path + ".tmp", self.ivf_vectors_path)
+        tmp = os.path.join(self.directory, ".ivf.npz")
+        with open(tmp, "wb") as f:
+            np.savez(f, centroids=centroids, order=order, offsets=offsets,
+                     built_rows=np.int64(self.rows), n_probe=np.int64(n_probe))
+        os.replace(tmp, self.ivf_path)
+        self._load_ivf()
+
+    def drop_ivf(self):
+        self.ivf = None
+        for path in (self.ivf_path, self.ivf_vectors_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+
+class LocalVectorIndex:
+    """
+    A Pinecone-style index on local disk, so RAGStorage, VectorLoader and
+    FeatureStore.sync_rag work offline. Each namespace is a memory-mapped float32
+    matrix with a JSON-lines metadata sidecar (see _Namespace); queries score by
+    cosine similarity, exactly or through an optional IVF index (build_ivf()).
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._namespaces = {}
+        self._lock = threading.Lock()
+
+    def _namespace(self, namespace: str) -> _Namespace:
+        with self._lock:
+            if namespace not in self._namespaces:
+                self._namespaces[namespace] = _Namespace(os.path.join(self.directory, namespace or DEFAULT_NAMESPACE_DIR))
+            return self._namespaces[namespace]
+
+    def upsert(self, vectors: list, namespace: str = ""):
+        """Write {"id", "values", "metadata"} vectors (Pinecone's upsert())."""
+        if not vectors:
+            return _Response(upserted_count=0)
+        ids, values, metadata = [], [], []
+        for vector in vectors:
+            vid = vector.get("id", vector.get("_id"))
+            if vector.get("values") is None:
+                raise ValueError(f"Vector '{vid}' has no values; the local backend does not embed text")
+            ids.append(vid)
+            values.append(vector["values"])
+            # Flat records (no "metadata" key) keep their other fields as metadata
+            metadata.append(vector["metadata"] if "metadata" in vector else
+                            {k: v for k, v in vector.items() if k not in ("id", "_id", "values")})
+        ns = self._namespace(namespace)
+        with ns.lock:
+            ns.upsert(ids, values, metadata)
+        return _Response(upserted_count=len(ids))
+
+    def upsert_records(self, namespace: str, records: list):
+        """Same as upsert(), with upsert_records()' argument order."""
+        return self.upsert(records, namespace=namespace)
+
+    def fetch(self, ids: list, namespace: str = ""):
+        ns = self._namespace(namespace)
+        vectors = {}
+        for vid in ids:
+            row = ns.row_of.get(vid)
+            if row is not None and ns._live[row]:
+                vectors[vid] = _Response(id=vid, values=ns._X[row].tolist(), metadata=ns.metadata[row])
+        return _Response(vectors=vectors, namespace=namespace)
+
+    def query(self, vector=None, id: str = None, top_k: int = 10, namespace: str = "", filter: dict = None,
+              include_values: bool = False, include_metadata: bool = False, n_probe: int = None):
+        """
+        Nearest vectors by cosine similarity.
+
+        Args:
+            vector: Query vector (or give `id` to query with a stored vector)
+            top_k: Number of matches
+            namespace: Namespace to search
+            filter: Pinecone metadata filter (see matches_filter)
+            include_values: Return each match's values
+            include_metadata: Return each match's metadata
+            n_probe: IVF lists to scan (only used once build_ivf() has run)
+
+        Returns:
+            _Response: matches (id, score, values, metadata), best first
+        """
+        ns = self._namespace(namespace)
+        if vector is None:
+            vector = ns._X[ns.row_of[id]]
+        rows, scores = ns.search(vector, top_k, n_probe, filter)
+        matches = [
+            _Response(
+                id=ns.ids[row],
+                score=float(score),
+                values=ns._X[row].tolist() if include_values else [],
+                metadata=ns.metadata[row] if include_metadata else None,
+            )
+            for row, score in zip(rows.tolist(), scores.tolist())
+        ]
+        return _Response(matches=matches, namespace=namespace)
+
+    def list_paginated(self, prefix: str = None, limit: int = 100, pagination_token: str = None, namespace: str = ""):
+        ids = [vid for vid in self._namespace(namespace).live_ids() if not prefix or vid.startswith(prefix)]
+        start = int(pagination_token or 0)
+        token = str(start + limit) if start + limit < len(ids) else None
+        return _Response(
+            vectors=[_Response(id=vid) for vid in ids[start:start + limit]],
+            pagination=_Response(next=token) if token else None,
+            namespace=namespace,
+        )
+
+    def list(self, prefix: str = None, limit: int = 100, namespace: str = ""):
+        """Yield pages of ids, like the Pinecone client's list()."""
+        ids = [vid for vid in self._namespace(namespace).live_ids() if not prefix or vid.startswith(prefix)]
+        for start in range(0, len(ids), limit):
+            yield ids[start:start + limit]
+
+    def delete(self, ids: list, namespace: str = ""):
+        ns = self._namespace(namespace)
+        with ns.lock:
+            ns.delete(ids)
+
+    def describe_index_stats(self):
+        namespaces, dimension = {}, None
+        if os.path.isdir(self.directory):
+            for name in sorted(os.listdir(self.directory)):
+                namespace = "" if name == DEFAULT_NAMESPACE_DIR else name
+                ns = self._namespace(namespace)
+                namespaces[namespace] = _Response(vector_count=len(ns))
+                dimension = dimension or ns.dim
+        return _Response(
+            dimension=dimension,
+            total_vector_count=sum(ns.vector_count for ns in namespaces.values()),
+            namespaces=namespaces,
+        )
+
+    def build_ivf(self, namespace: str = "", n_lists: int = None, n_probe: int = None):
+        """
+        Build (or rebuild) the approximate IVF index for a namespace. Queries then
+        scan the n_probe lists whose centroids are closest, instead of every row.
+        Rows added later are scanned exactly; overwriting an indexed row drops the
+        IVF index until it is rebuilt.
+
+        Args:
+            namespace: Namespace to index
+            n_lists: Number of centroids (default: sqrt(rows))
+            n_probe: Lists scanned per query by default (default: n_lists / 8)
+        """
+        ns = self._namespace(namespace)
+        with ns.lock:
+            ns.build_ivf(n_lists, n_probe)
+
+
+class LocalVectorClient:
+    """Stand-in for the Pinecone client that hands out LocalVectorIndex handles."""
+
+    def __init__(self, directory: str = LOCAL_INDEX_DIR):
+        self.directory = directory
+        self._indexes = {}
+
+    def has_index(self, name: str) -> bool:
+        return os.path.isdir(os.path.join(self.directory, name))
+
+    def create_index_for_model(self, name: str, **kwargs):
+        os.makedirs(os.path.join(self.directory, name), exist_ok=True)
+
+    def Index(self, name: str) -> LocalVectorIndex:
+        if name not in self._indexes:
+            self._indexes[name] = LocalVectorIndex(os.path.join(self.directory, name))
+        return self._indexes[name]
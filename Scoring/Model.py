@@ -1,51 +1,321 @@
-from sklearn.model_selection import train_test_split
+from sklearn.model_selection import train_test_split, GridSearchCV, RandomizedSearchCV, StratifiedKFold, KFold
 from sklearn.ensemble import RandomForestClassifier
+from sklearn.pipeline import Pipeline
 import joblib
 import time
 import os
 import numpy as np
+from CompiledForest import CompiledForest
+from Compression import CompressedModel, EmbeddingCompressor, compressor_path
+from ModelRegistry import ModelRegistry, chain_hash, training_hash
+from TrainingCheckpoint import TrainingCheckpoint
+
+MODELS_DIR = os.path.join(os.path.dirname(__file__), "models")
+
+# Searched when Model.train(search=True) is called without a param_grid
+DEFAULT_PARAM_GRID = {
+    "n_estimators": [100, 300],
+    "max_depth": [None, 20],
+    "min_samples_leaf": [1, 2],
+    "max_features": ["sqrt", 0.3],
+}
+
+# Fold indices per (training set, k, seed), reused across training runs on the same data
+_fold_cache = {}
+
+
+def cv_splits(X, y, folds: int, random_state: int = 42) -> list:
+    """
+    Stratified k-fold train/validation indices, computed once per training set.
+
+    Args:
+        X: Features of the rows being split
+        y: Labels of the rows being split
+        folds: Number of folds
+        random_state: Shuffle seed
+
+    Returns:
+        list: (train_indices, validation_indices) pairs
+    """
+    y = np.asarray(y)
+    key = (training_hash(X, y), folds, random_state)
+    if key not in _fold_cache:
+        _, counts = np.unique(y, return_counts=True)
+        # Stratify when every class has a row in every fold
+        splitter = StratifiedKFold if counts.min() >= folds else KFold
+        _fold_cache[key] = list(splitter(n_splits=folds, shuffle=True, random_state=random_state).split(np.zeros(len(y)), y))
+    return _fold_cache[key]
+
 
 class Model:
-    def __init__(self):
+    def __init__(self, models_dir: str = MODELS_DIR, compressor: EmbeddingCompressor = None):
+        """
+        Args:
+            models_dir: Directory models and the registry are saved to
+            compressor: Compress embeddings before the forest sees them; fit in
+                train() and saved next to the model
+        """
         self.model = RandomForestClassifier()
+        self.models_dir = models_dir
+        self.compressor = compressor
+        self.search_results = None
+
+    def _adopt(self, model):
+        """Take a model loaded from the registry, unwrapping its compressor if it has one."""
+        if isinstance(model, CompressedModel):
+            self.compressor, model = model.compressor, model.model
+        self.model = model
 
-    def train(self, X, y):
+    def _features(self, X):
+        return self.compressor.transform(X) if self.compressor is not None else X
+
+    @classmethod
+    def from_registry(cls, version: str = None, models_dir: str = MODELS_DIR) -> "Model":
         """
-        Train the model with the provided features and labels.
+        Load a registered model (the active one by default) for further training.
+
+        Args:
+            version: Version id; defaults to the active version
+            models_dir: Directory holding the registry
+
+        Returns:
+            Model: Wrapper around the loaded estimator
+        """
+        model = cls(models_dir)
+        model._adopt(ModelRegistry(models_dir).load(version, compiled=False)[1])
+        return model
+
+    def train(self, X, y, activate: bool = False, search: bool = False, param_grid: dict = None,
+              n_iter: int = None, folds: int = 5, n_jobs: int = -1, ids=None):
+        """
+        Train the model with the provided features and labels, then save it and
+        record it in the model registry.
+
+        By default this fits one forest on a 70/15/15 train/validation/test split.
+        With search=True, 15% is still held out for test, and the rest goes through a
+        hyperparameter search where every candidate is scored by k-fold
+        cross-validation; candidates and folds run in parallel worker processes.
 
         Args:
             X: Features for training
             y: Labels for training
+            activate: Make the new model the active version in the registry
+            search: Run a cross-validated hyperparameter search
+            param_grid: Candidate hyperparameters (defaults to DEFAULT_PARAM_GRID)
+            n_iter: Sample this many candidates instead of trying the full grid
+            folds: Number of cross-validation folds
+            n_jobs: Worker processes for the search (-1 uses every core)
+            ids: Vector ids of the rows; when given, the rows become the checkpoint
+                that later update() calls build on (uncompressed, so a later full
+                retrain can refit the compressor)
 
         Returns:
-            tuple: Validation accuracy, test accuracy, model path
+            tuple: Validation accuracy (mean CV accuracy of the best candidate when
+                searching), test accuracy, model path
+        """
+        if search:
+            val_accuracy, test_accuracy = self._search(X, y, param_grid or DEFAULT_PARAM_GRID, n_iter, folds, n_jobs)
+        else:
+            X_train, X_temp, y_train, y_temp = train_test_split(X, y, test_size=0.3, random_state=42)
+            X_val, X_test, y_val, y_test = train_test_split(X_temp, y_temp, test_size=0.5, random_state=42)
+
+            if self.compressor is not None:
+                # Fit on the training rows only, so validation and test rows stay unseen
+                start = time.perf_counter()
+                X_train = self.compressor.fit(X_train).transform(X_train)
+                X_val, X_test = self.compressor.transform(X_val), self.compressor.transform(X_test)
+                print(f"🗜️ Compressed {np.shape(X)[1]} -> {X_train.shape[1]} features ({self.compressor.name}) "
+                      f"in {time.perf_counter() - start:.1f}s")
+
+            self.model.fit(X_train, y_train)
+
+            val_accuracy = self.model.score(X_val, y_val)
+            test_accuracy = self.model.score(X_test, y_test)
+
+        model_path, version = self._save(X, y, val_accuracy, test_accuracy, activate)
+        if ids is not None:
+            checkpoint = TrainingCheckpoint(self.models_dir)
+            checkpoint.reset(version, checkpoint.save_deltas(ids, X, y), len(y), ids=ids)
+
+        return val_accuracy, test_accuracy, model_path
+
+    def update(self, X, y, ids, new_trees: int = 50, max_trees: int = 500, replay_ratio: float = 4.0,
+               activate: bool = False):
         """
-        X_train, X_temp, y_train, y_temp = train_test_split(X, y, test_size=0.3, random_state=42)
-        X_val, X_test, y_val, y_test = train_test_split(X_temp, y_temp, test_size=0.5, random_state=42)
+        Incrementally train on rows that arrived since the last checkpoint.
 
-        self.model.fit(X_train, y_train)
+        New trees are added to the forest (warm_start) and fit on the new rows plus
+        a replay sample of earlier rows (replay_ratio rows per new row), so every
+        known class is still represented; existing trees are kept as they are. Once the forest has more
+        than max_trees, the oldest trees are dropped. Cost grows with the size of the
+        delta, not the history. A label the model has never seen cannot be added to
+        existing trees, so in that case this falls back to a full retrain.
+
+        Args:
+            X: Features for training (rows already in the checkpoint are skipped)
+            y: Labels for training
+            ids: Vector ids of the rows
+            new_trees: Trees added per update
+            max_trees: Largest forest kept
+            replay_ratio: Replay rows per new row
+            activate: Make the new model the active version in the registry
+
+        Returns:
+            tuple: Validation accuracy, test accuracy (both on held-out new rows),
+                model path; None when there was nothing new
+        """
+        checkpoint = TrainingCheckpoint(self.models_dir)
+        state = checkpoint.read()
+        if state["version"] is None:
+            raise ValueError("No training checkpoint; run train(X, y, ids=...) first.")
+
+        ids, X, y = checkpoint.unseen(ids, X, y)
+        if len(y) == 0:
+            print("ℹ️ No new labeled rows since the last checkpoint.")
+            return None
+
+        if not hasattr(self.model, "estimators_"):
+            self._adopt(ModelRegistry(self.models_dir).load(state["version"], compiled=False)[1])
+
+        if set(np.unique(y).tolist()) - set(self.model.classes_.tolist()):
+            print("⚠️ New labels in this batch; retraining on the full history.")
+            return self._retrain_all(checkpoint, ids, X, y, activate)
+
+        # Hold out new rows the same way train() does
+        if len(y) >= 10:
+            X_fit, X_temp, y_fit, y_temp = train_test_split(X, y, test_size=0.3, random_state=42)
+            X_val, X_test, y_val, y_test = train_test_split(X_temp, y_temp, test_size=0.5, random_state=42)
+        else:
+            print("⚠️ Fewer than 10 new rows; accuracy below is measured on the training rows.")
+            X_fit = X_val = X_test = X
+            y_fit = y_val = y_test = y
+
+        replay_X, replay_y = checkpoint.replay_sample(int(len(y_fit) * replay_ratio), self.model.classes_)
+        if replay_X is not None:
+            X_fit, y_fit = np.concatenate([X_fit, replay_X]), np.concatenate([y_fit, replay_y])
+        if len(np.unique(y_fit)) != len(self.model.classes_):
+            # warm_start re-derives classes_ from y, which must match the existing trees
+            print("⚠️ Not every known label is available to train on; retraining on the full history.")
+            return self._retrain_all(checkpoint, ids, X, y, activate)
+        # The compressor stays as fitted by the last full train, so old and new trees share features
+        X_fit, X_val, X_test = self._features(X_fit), self._features(X_val), self._features(X_test)
+
+        start = time.perf_counter()
+        self.model.set_params(warm_start=True, n_estimators=len(self.model.estimators_) + new_trees)
+        self.model.fit(X_fit, y_fit)
+        if len(self.model.estimators_) > max_trees:
+            self.model.estimators_ = self.model.estimators_[-max_trees:]
+            self.model.set_params(n_estimators=max_trees)
+        print(f"🌲 Added {new_trees} trees on {len(y)} new rows in {time.perf_counter() - start:.1f}s")
 
         val_accuracy = self.model.score(X_val, y_val)
         test_accuracy = self.model.score(X_test, y_test)
 
+        # The parent's hash chained with the new rows', so the hash covers everything trained on
+        parent_hash = ModelRegistry(self.models_dir).metadata(state["version"])["train_hash"]
+        model_path, version = self._save(X, y, val_accuracy, test_accuracy, activate, parent=state["version"],
+                                         train_hash=chain_hash(parent_hash, training_hash(X, y)))
+        checkpoint.commit(version, checkpoint.save_deltas(ids, X, y), len(y), ids=ids)
+
+        return val_accuracy, test_accuracy, model_path
+
+    def _retrain_all(self, checkpoint, ids, X, y, activate):
+        old_ids, old_X, old_y = checkpoint.load_all()
+        self.model = RandomForestClassifier()
+        return self.train(
+            np.concatenate([old_X, X]), np.concatenate([old_y, y]),
+            activate=activate, ids=np.concatenate([old_ids, ids]),
+        )
+
+    def _save(self, X, y, val_accuracy, test_accuracy, activate, parent=None, train_hash=None):
         # Save model
-        persist_dir = os.path.join(os.path.dirname(__file__), "models")
+        persist_dir = self.models_dir
         os.makedirs(persist_dir, exist_ok=True)
 
         timestamp = time.strftime('%Y%m%d_%H%M%S')
         model_path = os.path.join(persist_dir, f"scoring_model_{timestamp}.joblib")
+        suffix = 1
+        while os.path.exists(model_path):
+            # More than one model saved within the same second
+            model_path = os.path.join(persist_dir, f"scoring_model_{timestamp}_{suffix}.joblib")
+            suffix += 1
         joblib.dump(self.model, model_path)
+        compressor = self.compressor.save(compressor_path(model_path)) if self.compressor is not None else None
 
-        return val_accuracy, test_accuracy, model_path
+        version = ModelRegistry(persist_dir).register(
+            model_path,
+            val_accuracy,
+            test_accuracy,
+            n_features=np.shape(X)[1],
+            train_hash=train_hash or training_hash(X, y),
+            activate=activate,
+            model=self.model,
+            parent=parent,
+            compressor_path=compressor,
+        )
+        return model_path, version
+
+    def _search(self, X, y, param_grid, n_iter, folds, n_jobs):
+        X_search, X_test, y_search, y_test = train_test_split(X, y, test_size=0.15, random_state=42)
+
+        # Trees are built one per worker process; the search parallelizes over candidates x folds
+        estimator = RandomForestClassifier(n_jobs=1, random_state=42)
+        if self.compressor is not None:
+            # The compressor is refit inside every fold, on that fold's training rows only
+            estimator = Pipeline([("compress", self.compressor), ("forest", estimator)])
+            param_grid = {f"forest__{name}": values for name, values in param_grid.items()}
+        splits = cv_splits(X_search, y_search, folds)
+        if n_iter:
+            search = RandomizedSearchCV(estimator, param_grid, n_iter=n_iter, cv=splits, n_jobs=n_jobs, random_state=42)
+        else:
+            search = GridSearchCV(estimator, param_grid, cv=splits, n_jobs=n_jobs)
+
+        start = time.perf_counter()
+        search.fit(X_search, y_search)
+        elapsed = time.perf_counter() - start
+
+        results = search.cv_results_
+        self.search_results = [
+            {
+                "params": {name.replace("forest__", ""): value for name, value in results["params"][i].items()},
+                "mean_accuracy": float(results["mean_test_score"][i]),
+                "std_accuracy": float(results["std_test_score"][i]),
+                # Summed over folds: the compute each candidate cost, whatever the parallelism
+                "seconds": float((results["mean_fit_time"][i] + results["mean_score_time"][i]) * folds),
+            }
+            for i in np.argsort(results["rank_test_score"])
+        ]
+        print(f"🔍 Searched {len(self.search_results)} candidates x {folds} folds in {elapsed:.1f}s")
+        for candidate in self.search_results:
+            print(f"   {candidate['mean_accuracy']:.4f} ± {candidate['std_accuracy']:.4f}  "
+                  f"{candidate['seconds']:6.1f}s  {candidate['params']}")
+
+        best = search.best_estimator_
+        if self.compressor is not None:
+            # Refit on every search row; the test rows were never part of it
+            self.compressor, best = best.named_steps["compress"], best.named_steps["forest"]
+        self.model = best
+        return search.best_score_, self.model.score(self._features(X_test), y_test)
 
     def predict(self, X):
         """
         Predict labels for the provided features.
 
         Args:
-            X: Features for prediction
+            X: Features for prediction (raw embeddings; compressed here if the model was)
 
         Returns:
             array: Predicted labels
         """
-        return self.model.predict(X)
+        return self.model.predict(self._features(X))
+
+    def compile(self):
+        """
+        Flatten the trained forest for fast, low-footprint inference.
+
+        Returns:
+            CompiledForest: Array-backed copy of the model with identical predictions
+                (wrapped in a CompressedModel when the model uses a compressor)
+        """
+        compiled = CompiledForest.from_sklearn(self.model)
+        return CompressedModel(self.compressor, compiled) if self.compressor is not None else compiled
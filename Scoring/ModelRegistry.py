@@ -0,0 +1,237 @@
+import fcntl
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+import joblib
+import numpy as np
+from CompiledForest import CompiledForest, compiled_path
+from Compression import CompressedModel, EmbeddingCompressor
+
+MODELS_DIR = os.path.join(os.path.dirname(__file__), "models")
+REGISTRY_FILE = "registry.json"
+LOCK_FILE = "registry.lock"
+
+
+def training_hash(X, y) -> str:
+    """
+    Fingerprint of a training set, so two versions can be told apart by their data.
+
+    Args:
+        X: Training features
+        y: Training labels
+
+    Returns:
+        str: sha256 hex digest over the shapes and contents of X and y
+    """
+    digest = hashlib.sha256()
+    for array in (np.asarray(X), np.asarray(y)):
+        digest.update(str((array.shape, array.dtype.str)).encode())
+        # A slice at a time, so hashing a memory-mapped matrix never copies all of it
+        for start in range(0, len(array), 65536):
+            chunk = array[start:start + 65536]
+            digest.update(np.ascontiguousarray(chunk).tobytes() if chunk.dtype != object else repr(chunk.tolist()).encode())
+    return digest.hexdigest()
+
+
+def chain_hash(parent_hash: str, delta_hash: str) -> str:
+    """
+    Fingerprint of an incrementally trained version's data: its parent's
+    train_hash followed by the training_hash() of the rows it added.
+    """
+    return hashlib.sha256(f"{parent_hash}:{delta_hash}".encode()).hexdigest()
+
+
+def version_of(model_path: str) -> str:
+    """scoring_model_20250719_101500.joblib -> 20250719_101500"""
+    name = os.path.splitext(os.path.basename(model_path))[0]
+    return name[len("scoring_model_"):] if name.startswith("scoring_model_") else name
+
+
+class ModelRegistry:
+    """
+    Tracks the models saved by Model.train in `models/registry.json`: their
+    metadata, which version is active, and a compiled copy of each forest.
+
+    registry.json is only ever replaced whole (write to a temp file, then
+    os.replace), so readers in other processes see either the old or the new
+    registry, never a partial one. Updates hold an exclusive lock on
+    `models/registry.lock`, so concurrent train.py runs and `activate` calls from
+    other processes never lose each other's changes.
+    """
+
+    def __init__(self, models_dir: str = MODELS_DIR):
+        self.models_dir = models_dir
+        self.path = os.path.join(models_dir, REGISTRY_FILE)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def _locked(self):
+        """Hold the registry for a read-modify-write, across threads and processes."""
+        os.makedirs(self.models_dir, exist_ok=True)
+        with self._lock, open(os.path.join(self.models_dir, LOCK_FILE), "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def read(self) -> dict:
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {"active": None, "models": {}}
+
+    def _write(self, registry: dict):
+        os.makedirs(self.models_dir, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.models_dir, prefix=".registry.", suffix=".json")
+        with os.fdopen(fd, "w") as f:
+            json.dump(registry, f, indent=2, sort_keys=True)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+
+    def register(self, model_path: str, val_accuracy: float, test_accuracy: float, n_features: int,
+                 train_hash: str, activate: bool = False, model=None, parent: str = None,
+                 compressor_path: str = None) -> str:
+        """
+        Record a saved model and write its compiled copy next to it.
+
+        Args:
+            model_path: Path returned by Model.train
+            val_accuracy: Validation accuracy
+            test_accuracy: Test accuracy
+            n_features: Feature dimension the model expects
+            train_hash: training_hash() of the training set
+            activate: Make this the active version (the first model registered always is)
+            model: The fitted estimator, if already in memory (otherwise loaded from model_path)
+            parent: Version this one was incrementally trained from; train_hash is
+                then chain_hash() of the parent's hash and the new rows' hash
+            compressor_path: Saved EmbeddingCompressor the model's inputs go through;
+                n_features is then the raw embedding dimension
+
+        Returns:
+            str: The version id
+        """
+        version = version_of(model_path)
+        if model is None:
+            model = joblib.load(model_path)
+        compiled = CompiledForest.from_sklearn(model).save(compiled_path(model_path))
+
+        with self._locked():
+            registry = self.read()
+            registry["models"][version] = {
+                "path": os.path.basename(model_path),
+                "compiled_path": os.path.basename(compiled),
+                "val_accuracy": float(val_accuracy),
+                "test_accuracy": float(test_accuracy),
+                "n_features": int(n_features),
+                "train_hash": train_hash,
+                "registered_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "parent": parent,
+                "compressor_path": os.path.basename(compressor_path) if compressor_path else None,
+            }
+            if activate or registry["active"] is None:
+                registry["active"] = version
+            self._write(registry)
+        return version
+
+    def activate(self, version: str):
+        """Point serving processes at another registered version."""
+        with self._locked():
+            registry = self.read()
+            if version not in registry["models"]:
+                raise KeyError(f"Unknown model version '{version}'")
+            registry["active"] = version
+            self._write(registry)
+
+    def active_version(self) -> str:
+        return self.read()["active"]
+
+    def metadata(self, version: str = None) -> dict:
+        registry = self.read()
+        version = version or registry["active"]
+        if version not in registry["models"]:
+            raise KeyError(f"Unknown model version '{version}'")
+        return {"version": version, **registry["models"][version]}
+
+    def load(self, version: str = None, compiled: bool = True):
+        """
+        Load a registered model (the active one by default).
+
+        Args:
+            version: Version id; defaults to the active version
+            compiled: Load the CompiledForest, memory-mapped so every process serving
+                this version shares one copy of the arrays. With False, load the
+                sklearn estimator, which copies its trees into private memory.
+
+        Returns:
+            tuple: (version, model). Models trained on compressed embeddings come
+                wrapped in a CompressedModel, so they still take raw embeddings.
+        """
+        meta = self.metadata(version)
+        if compiled:
+            model = CompiledForest.load(os.path.join(self.models_dir, meta["compiled_path"]))
+        else:
+            model = joblib.load(os.path.join(self.models_dir, meta["path"]))
+        if meta.get("compressor_path"):
+            compressor = EmbeddingCompressor.load(os.path.join(self.models_dir, meta["compressor_path"]))
+            model = CompressedModel(compressor, model)
+        return meta["version"], model
+
+    def watch(self, server, interval: float = 5.0, compiled: bool = True) -> threading.Event:
+        """
+        Keep a ModelServer on the active version: poll registry.json and hot-swap the
+        server's model whenever the active version changes.
+
+        Args:
+            server: ModelServer to update
+            interval: Seconds between polls
+            compiled: Passed to load()
+
+        Returns:
+            threading.Event: Set it to stop watching
+        """
+        stop = threading.Event()
+
+        def poll():
+            last_mtime = None
+            while not stop.wait(interval):
+                try:
+                    mtime = os.stat(self.path).st_mtime_ns
+                except FileNotFoundError:
+                    continue
+                if mtime == last_mtime:
+                    continue
+                last_mtime = mtime
+                active = self.active_version()
+                if active and active != server.version:
+                    try:
+                        version, model = self.load(active, compiled=compiled)
+                    except Exception as e:
+                        print(f"❌ Could not load model version {active}, keeping {server.version}: {e}")
+                        continue
+                    server.swap_model(model, version)
+                    print(f"🔁 Swapped scoring model to version {version}")
+
+        threading.Thread(target=poll, name="model-registry-watch", daemon=True).start()
+        return stop
+
+
+if __name__ == "__main__":
+    registry = ModelRegistry()
+    if len(sys.argv) == 3 and sys.argv[1] == "activate":
+        registry.activate(sys.argv[2])
+        print(f"✅ Active model version: {sys.argv[2]}")
+    else:
+        current = registry.read()
+        for version, meta in sorted(current["models"].items()):
+            marker = "*" if version == current["active"] else " "
+            print(f"{marker} {version}  val {meta['val_accuracy']:.4f}  test {meta['test_accuracy']:.4f}  "
+                  f"features {meta['n_features']}  data {meta['train_hash'][:12]}"
+                  + (f"  compressed {meta['compressor_path']}" if meta.get("compressor_path") else ""))
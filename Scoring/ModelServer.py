@@ -0,0 +1,254 @@
+import glob
+import os
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+import joblib
+import numpy as np
+
+MODELS_DIR = os.path.join(os.path.dirname(__file__), "models")
+
+_STOP = object()
+
+
+def latest_model_path(models_dir: str = MODELS_DIR) -> str:
+    """
+    Find the most recently saved scoring model.
+
+    Args:
+        models_dir: Directory that Model.train() saves into
+
+    Returns:
+        str: Path to the newest scoring_model_*.joblib
+    """
+    # The compiled forest and the compressor are saved beside each model under the same stem
+    sidecars = (".compiled.joblib", ".compressor.joblib")
+    paths = sorted(
+        path for path in glob.glob(os.path.join(models_dir, "scoring_model_*.joblib"))
+        if not path.endswith(sidecars)
+    )
+    if not paths:
+        raise FileNotFoundError(f"No scoring_model_*.joblib found in {models_dir}")
+    # Timestamps in the file names sort chronologically
+    return paths[-1]
+
+
+class _Request:
+    __slots__ = ("rows", "future", "enqueued")
+
+    def __init__(self, rows: np.ndarray):
+        self.rows = rows
+        self.future = Future()
+        self.enqueued = time.perf_counter()
+
+
+class ModelServer:
+    """
+    Keeps one model resident and serves concurrent predict calls through dynamic
+    micro-batching: requests that arrive within `max_wait_ms` of each other (up to
+    `max_batch_size` rows) are stacked and sent through a single predict call.
+    """
+
+    def __init__(self, model, max_batch_size: int = 64, max_wait_ms: float = 5.0, latency_window: int = 10000,
+                 version: str = None):
+        """
+        Args:
+            model: Anything with a vectorized predict(X), e.g. a fitted estimator or a Model
+            max_batch_size: Most rows sent to one predict call
+            max_wait_ms: How long the first request in a batch waits for others to join
+            latency_window: Number of recent request latencies kept for percentiles
+            version: Registry version of the model, if it came from one
+        """
+        self.model = model
+        self.version = version
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=latency_window)
+        self._requests = 0
+        self._rows = 0
+        self._batches = 0
+        self._errors = 0
+        self._predict_seconds = 0.0
+        self._swaps = 0
+        self._started = None
+        self._watch = None
+
+    @classmethod
+    def from_path(cls, model_path: str = None, **kwargs) -> "ModelServer":
+        """
+        Load a saved model once and wrap it in a server.
+
+        Args:
+            model_path: Path to a scoring_model_*.joblib; defaults to the newest one
+
+        Returns:
+            ModelServer: Server (not yet started) around the loaded model
+        """
+        model_path = model_path or latest_model_path()
+        print(f"📦 Loading scoring model from {model_path}")
+        return cls(joblib.load(model_path), **kwargs)
+
+    @classmethod
+    def from_registry(cls, registry, version: str = None, watch: bool = True, **kwargs) -> "ModelServer":
+        """
+        Serve a registered model (the active one by default), optionally following
+        the registry so activating a new version swaps it in without a restart.
+
+        Args:
+            registry: ModelRegistry to load from
+            version: Version id; defaults to the active version
+            watch: Poll the registry and hot-swap when the active version changes
+
+        Returns:
+            ModelServer: Server (not yet started) around the loaded model
+        """
+        version, model = registry.load(version)
+        server = cls(model, version=version, **kwargs)
+        if watch:
+            server._watch = registry.watch(server)
+        return server
+
+    def swap_model(self, model, version: str = None):
+        """
+        Replace the served model. Batches already running finish on the old model;
+        every batch after this call uses the new one, so no request is dropped.
+        """
+        self.model, self.version = model, version
+        with self._lock:
+            self._swaps += 1
+
+    def start(self) -> "ModelServer":
+        if self._thread is None:
+            self._started = time.perf_counter()
+            self._thread = threading.Thread(target=self._serve, name="model-server", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout: float = None):
+        """Stop accepting work; requests already queued are still answered."""
+        if self._watch is not None:
+            self._watch.set()
+        if self._thread is not None:
+            self._queue.put(_STOP)
+            self._thread.join(timeout)
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def submit(self, X) -> Future:
+        """
+        Queue rows for prediction.
+
+        Args:
+            X: One feature vector or a 2D array of rows
+
+        Returns:
+            Future: Resolves to the predictions for exactly these rows
+        """
+        if self._thread is None:
+            raise RuntimeError("ModelServer is not running; call start() first")
+        rows = np.asarray(X)
+        if rows.ndim == 1:
+            rows = rows.reshape(1, -1)
+        request = _Request(rows)
+        self._queue.put(request)
+        return request.future
+
+    def predict(self, X, timeout: float = None):
+        """Blocking wrapper around submit()."""
+        return self.submit(X).result(timeout)
+
+    def _collect(self, first: _Request) -> list:
+        batch, size = [first], len(first.rows)
+        deadline = time.perf_counter() + self.max_wait
+        while size < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                request = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if request is _STOP:
+                # Finish this batch, then exit
+                self._queue.put(_STOP)
+                break
+            batch.append(request)
+            size += len(request.rows)
+        return batch
+
+    def _serve(self):
+        while True:
+            first = self._queue.get()
+            if first is _STOP:
+                return
+            batch = self._collect(first)
+            self._run_batch(batch)
+
+    def _run_batch(self, batch: list):
+        start = time.perf_counter()
+        try:
+            X = batch[0].rows if len(batch) == 1 else np.concatenate([r.rows for r in batch])
+            # One read of self.model per batch, so a concurrent swap never splits a batch
+            model = self.model
+            predictions = model.predict(X)
+        except Exception as e:
+            if len(batch) > 1:
+                # One malformed request should not fail everyone it was batched with
+                for request in batch:
+                    self._run_batch([request])
+                return
+            with self._lock:
+                self._errors += 1
+            batch[0].future.set_exception(e)
+            return
+        done = time.perf_counter()
+
+        offset = 0
+        for request in batch:
+            n = len(request.rows)
+            request.future.set_result(predictions[offset:offset + n])
+            offset += n
+
+        with self._lock:
+            self._batches += 1
+            self._requests += len(batch)
+            self._rows += offset
+            self._predict_seconds += done - start
+            self._latencies.extend(done - r.enqueued for r in batch)
+
+    def stats(self) -> dict:
+        """Throughput and latency counters since start()."""
+        with self._lock:
+            latencies = np.array(self._latencies) if self._latencies else None
+            elapsed = time.perf_counter() - self._started if self._started else 0.0
+            return {
+                "version": self.version,
+                "swaps": self._swaps,
+                "requests": self._requests,
+                "rows": self._rows,
+                "batches": self._batches,
+                "errors": self._errors,
+                "queued": self._queue.qsize(),
+                "mean_batch_size": self._rows / self._batches if self._batches else 0.0,
+                "rows_per_second": self._rows / elapsed if elapsed else 0.0,
+                "predict_seconds": self._predict_seconds,
+                "latency_p50_ms": float(np.percentile(latencies, 50) * 1000) if latencies is not None else 0.0,
+                "latency_p99_ms": float(np.percentile(latencies, 99) * 1000) if latencies is not None else 0.0,
+            }
+
+
+if __name__ == "__main__":
+    with ModelServer.from_path() as server:
+        n_features = getattr(server.model, "n_features_in_", 1536)
+        print(server.predict(np.zeros(n_features)))
+        print(f"📊 {server.stats()}")
@@ -0,0 +1,129 @@
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+_MISSING = object()
+
+
+class LRUCache:
+    """Thread-safe least-recently-used cache with hit/miss counters."""
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self.hits = self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            value = self._data.get(key, _MISSING)
+            if value is _MISSING:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def get_or_compute(self, key, compute):
+        """Cached value for key, computing and storing it on a miss."""
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class TTLCache:
+    """
+    LRU cache whose entries expire after `ttl` seconds, or as soon as the
+    generation they were stored under is no longer current (see RAGStorage.store).
+    """
+
+    def __init__(self, ttl: float = 60.0, maxsize: int = 256):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.hits = self.misses = self.expired = self.invalidated = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, generation=None, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                expires_at, stored_generation, value = entry
+                if stored_generation != generation:
+                    self.invalidated += 1
+                elif time.monotonic() >= expires_at:
+                    self.expired += 1
+                else:
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return default
+
+    def put(self, key, value, generation=None):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, generation, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+def _ratio(hits: int, misses: int) -> float:
+    return hits / (hits + misses) if hits + misses else 0.0
+
+
+class QueryCache:
+    """
+    Two caches for similarity search over free-text queries:
+
+        embeddings  LRU of query embeddings, keyed by (normalized text, model)
+        results     short-lived search results, keyed by (normalized text, top_k, namespace)
+
+    Result entries are dropped when their TTL passes or when RAGStorage.store has
+    written to the namespace since they were cached.
+    """
+
+    def __init__(self, embedding_maxsize: int = 1024, result_ttl: float = 60.0, result_maxsize: int = 256):
+        """
+        Args:
+            embedding_maxsize: Query embeddings kept
+            result_ttl: Seconds a search result stays valid
+            result_maxsize: Search results kept
+        """
+        self.embeddings = LRUCache(embedding_maxsize)
+        self.results = TTLCache(result_ttl, result_maxsize)
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """Case-, width- and whitespace-insensitive form of a query."""
+        return re.sub(r"\s+", " ", unicodedata.normalize("NFKC", text)).strip().casefold()
+
+    def stats(self) -> dict:
+        return {
+            "embedding_hits": self.embeddings.hits,
+            "embedding_misses": self.embeddings.misses,
+            "embedding_hit_ratio": _ratio(self.embeddings.hits, self.embeddings.misses),
+            "result_hits": self.results.hits,
+            "result_misses": self.results.misses,
+            "result_hit_ratio": _ratio(self.results.hits, self.results.misses),
+            "result_expired": self.results.expired,
+            "result_invalidated": self.results.invalidated,
+        }
@@ -1,89 +1,368 @@
+import json
 import time
 import os
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
 from dotenv import load_dotenv
 from pinecone import Pinecone
+from VectorLoader import VectorLoader, _field
+
+load_dotenv()
+
+# Connections kept per client; covers the parallel upserts and fetches below
+CONNECTION_POOL_SIZE = 16
+INDEX_READY_TIMEOUT = 120.0
+
+# Shared across RAGStorage instances in this process
+_pool_lock = threading.Lock()
+_clients = {}
+_index_handles = {}
+# One lock per (client, index name), so a slow first-use create only blocks users of that index
+_index_locks = {}
+# Bumped whenever store() writes to a (client, namespace); cached search results carry it
+_store_generations = {}
+
+# Embeds search queries; the index's integrated model
+QUERY_EMBED_MODEL = "llama-text-embed-v2"
+
+# Pinecone's per-request limits for upserts
+UPSERT_MAX_RECORDS = 96
+UPSERT_MAX_BYTES = 2 * 1024 * 1024
+
+
+def _estimated_bytes(record: dict) -> int:
+    """Upper-bound JSON size of a record without serializing its values (~20 bytes per float)."""
+    values = record.get("values")
+    metadata = record.get("metadata")
+    return 64 + len(str(record["id"])) + 20 * (len(values) if values is not None else 0) + len(json.dumps(metadata, default=str))
+
+
+class StoreReport:
+    """Outcome of RAGStorage.store: counts plus one result dict per upsert chunk."""
+
+    def __init__(self, received: int = 0):
+        self.received = received
+        self.invalid = {}
+        self.chunks = []
+        self.seconds = 0.0
+
+    @property
+    def stored(self) -> int:
+        return sum(chunk["records"] for chunk in self.chunks if chunk["ok"])
+
+    @property
+    def failed(self) -> list:
+        return [chunk for chunk in self.chunks if not chunk["ok"]]
+
+    @property
+    def stored_ids(self) -> set:
+        return {vid for chunk in self.chunks if chunk["ok"] for vid in chunk["ids"]}
+
+    @property
+    def retries(self) -> int:
+        return sum(chunk["attempts"] - 1 for chunk in self.chunks)
+
+    def __bool__(self) -> bool:
+        return self.stored > 0 and not self.failed
+
+    def __repr__(self) -> str:
+        return (f"StoreReport(received={self.received}, stored={self.stored}, invalid={sum(self.invalid.values())}, "
+                f"chunks={len(self.chunks)}, failed={len(self.failed)}, retries={self.retries})")
+
+
+def _shared_client(backend: str, grpc: bool = False):
+    """One client per backend and settings per process, so its connection pool is reused."""
+    if backend == "local":
+        from LocalVectorIndex import LocalVectorClient, LOCAL_INDEX_DIR
+        key = (backend, os.environ.get("RAG_LOCAL_DIR", LOCAL_INDEX_DIR))
+    elif backend == "pinecone":
+        api_key = os.environ.get("PINECONE_API_KEY")
+        if not api_key:
+            raise ValueError("PINECONE_API_KEY not found in environment variables.")
+        key = (backend, api_key, grpc)
+    else:
+        raise ValueError(f"Unknown RAG backend '{backend}'; expected 'pinecone' or 'local'.")
+
+    with _pool_lock:
+        if key not in _clients:
+            if backend == "local":
+                _clients[key] = LocalVectorClient(key[1])
+            elif grpc:
+                try:
+                    from pinecone.grpc import PineconeGRPC
+                    _clients[key] = PineconeGRPC(api_key=api_key)
+                except ImportError as e:
+                    print(f"⚠️ gRPC transport unavailable ({e}); using HTTP. Install pinecone[grpc] to enable it.")
+                    _clients[key] = Pinecone(api_key=api_key, connection_pool_maxsize=CONNECTION_POOL_SIZE)
+            else:
+                _clients[key] = Pinecone(api_key=api_key, connection_pool_maxsize=CONNECTION_POOL_SIZE)
+        return _clients[key]
 
 
 class RAGStorage:
-    def __init__(self, index_name: str, field_map: dict = {"text": "chunk_text"}):
-        load_dotenv()
+    def __init__(self, index_name: str, field_map: dict = {"text": "chunk_text"}, client=None, backend: str = None,
+                 grpc: bool = None):
+        """
+        Construction makes no network calls: clients are shared per process, and
+        the index is checked (and created if missing) on first use.
+
+        Args:
+            index_name: Pinecone index to use (created if missing)
+            field_map: Record fields; field_map["text"] must be in every stored vector's metadata
+            client: Pinecone client to use instead of creating one from PINECONE_API_KEY
+                (e.g. a local fake for offline runs)
+            backend: "pinecone" or "local" (a LocalVectorIndex under RAG_LOCAL_DIR);
+                defaults to the RAG_BACKEND environment variable, then "pinecone"
+            grpc: Use Pinecone's gRPC transport (needs the pinecone[grpc] extra);
+                defaults to the RAG_GRPC environment variable
+        """
         self.index_name = index_name
         self.namespace = index_name.replace("index", "namespace")
         self.field_map = field_map
+        self.backend = backend or os.environ.get("RAG_BACKEND", "pinecone")
+        if grpc is None:
+            grpc = os.environ.get("RAG_GRPC", "").lower() in ("1", "true", "yes")
 
-        api_key = os.environ.get("PINECONE_API_KEY")
-        if not api_key:
-            raise ValueError("PINECONE_API_KEY not found in environment variables.")
+        self.ragProcessor = client if client is not None else _shared_client(self.backend, grpc)
+
+    def index(self, index_name: str = None):
+        """
+        Handle for an index, cached per client and name, so repeated calls (and
+        other RAGStorage instances on the same client) reuse it without a round-trip.
+        This storage's own index is created on first use if it does not exist.
+
+        Args:
+            index_name: Index to open (defaults to this storage's index)
+
+        Returns:
+            Index handle
+        """
+        name = index_name or self.index_name
+        key = (self.ragProcessor, name)
+        handle = _index_handles.get(key)
+        if handle is None:
+            with _pool_lock:
+                lock = _index_locks.setdefault(key, threading.Lock())
+            # Creating an index can poll for minutes; _pool_lock is not held meanwhile
+            with lock:
+                handle = _index_handles.get(key)
+                if handle is None:
+                    if name == self.index_name:
+                        self._ensure_index(name)
+                    handle = self.ragProcessor.Index(name)
+                    with _pool_lock:
+                        _index_handles[key] = handle
+        return handle
 
-        self.ragProcessor = Pinecone(api_key=api_key)
+    def _ensure_index(self, name: str):
+        if self.ragProcessor.has_index(name):
+            return
+        print(f"Index '{name}' does not exist. Creating...")
+        try:
+            self.ragProcessor.create_index_for_model(
+                name=name,
+                cloud="aws",
+                region="us-east-1",
+                embed={
+                    "model": "llama-text-embed-v2",
+                    "field_map": self.field_map
+                }
+            )
+            self._wait_until_ready(name)
+            print(f"Index '{name}' created successfully.")
+        except Exception as e:
+            raise RuntimeError(f"❌ Error creating index '{name}': {e}")
+
+    def _wait_until_ready(self, name: str, timeout: float = INDEX_READY_TIMEOUT):
+        """Poll describe_index until the new index reports ready, backing off up to 2s between polls."""
+        if not hasattr(self.ragProcessor, "describe_index"):
+            return
+        deadline = time.monotonic() + timeout
+        delay = 0.25
+        while True:
+            status = _field(self.ragProcessor.describe_index(name), "status")
+            if _field(status, "ready"):
+                return
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"Index '{name}' not ready after {timeout:.0f}s")
+            time.sleep(delay)
+            delay = min(delay * 2, 2.0)
 
-        if not self.ragProcessor.has_index(index_name):
-            print(f"Index '{index_name}' does not exist. Creating...")
+    def _validate(self, vectors: list) -> tuple:
+        """Split vectors into valid ones and per-reason invalid counts, in one pass."""
+        expected_field = self.field_map.get("text", "text")
+        reasons = [
+            "not a dict" if not isinstance(v, dict)
+            else "missing 'id'" if "id" not in v
+            else f"missing '{expected_field}'" if not isinstance(v.get("metadata"), dict) or expected_field not in v["metadata"]
+            else None
+            for v in vectors
+        ]
+        valid = [v for v, reason in zip(vectors, reasons) if reason is None]
+        invalid = {}
+        for reason in reasons:
+            if reason is not None:
+                invalid[reason] = invalid.get(reason, 0) + 1
+        return valid, invalid
+
+    def _chunks(self, records: list, max_records: int, max_bytes: int) -> list:
+        """Pack records into chunks under both the record-count and (estimated) request-size limits."""
+        chunks, chunk, size = [], [], 0
+        for record in records:
+            record_bytes = _estimated_bytes(record)
+            if chunk and (len(chunk) >= max_records or size + record_bytes > max_bytes):
+                chunks.append((chunk, size))
+                chunk, size = [], 0
+            chunk.append(record)
+            size += record_bytes
+        if chunk:
+            chunks.append((chunk, size))
+        return chunks
+
+    def _upsert_chunk(self, index, number: int, records: list, size: int, retries: int, backoff: float) -> dict:
+        result = {"chunk": number, "records": len(records), "ids": [record["id"] for record in records], "bytes": size,
+                  "attempts": 0, "ok": False, "error": None}
+        start = time.perf_counter()
+        for attempt in range(retries):
+            result["attempts"] = attempt + 1
             try:
-                self.ragProcessor.create_index_for_model(
-                    name=index_name,
-                    cloud="aws",
-                    region="us-east-1",
-                    embed={
-                        "model": "llama-text-embed-v2",
-                        "field_map": field_map
-                    }
-                )
-                time.sleep(2)
-                print(f"Index '{index_name}' created successfully.")
+                index.upsert_records(namespace=self.namespace, records=records)
+                result["ok"], result["error"] = True, None
+                break
             except Exception as e:
-                raise RuntimeError(f"❌ Error creating index '{index_name}': {e}")
-        else:
-            print(f"Index '{index_name}' already exists.")
+                result["error"] = str(e)
+                if attempt < retries - 1:
+                    time.sleep(backoff * 2 ** attempt * random.uniform(0.5, 1.5))
+        result["seconds"] = time.perf_counter() - start
+        return result
+
+    def store(self, vectors: list[dict], max_records: int = UPSERT_MAX_RECORDS, max_bytes: int = UPSERT_MAX_BYTES,
+              concurrency: int = 4, retries: int = 5, backoff: float = 0.5) -> "StoreReport":
+        """
+        Validate vectors and upsert them in chunks, several chunks at a time,
+        retrying failed chunks with jittered exponential backoff.
 
-    def store(self, vectors: list[dict]):
+        Args:
+            vectors: Dicts with id, values and metadata (metadata must hold field_map["text"])
+            max_records: Most records per upsert request
+            max_bytes: Most (estimated) bytes per upsert request
+            concurrency: Upsert requests in flight at once
+            retries: Attempts per chunk before giving up on it
+            backoff: Base delay in seconds; doubles with every retry
+
+        Returns:
+            StoreReport: Per-chunk results; truthy when something was stored and no chunk failed
+        """
+        report = StoreReport(received=len(vectors or []))
         if not vectors:
             print("⚠️ No vectors to store.")
-            return False
-
-        index = self.ragProcessor.Index(self.index_name)
-        valid_vectors = []
+            return report
 
-        # Debugging: Log the index name and namespace
+        index = self.index()
         print(f"Using index: {self.index_name}, namespace: {self.namespace}")
 
-        # Debugging: Log the vectors before validation
-        print(f"Vectors received for storage: {vectors}")
+        valid_vectors, report.invalid = self._validate(vectors)
+        if report.invalid:
+            details = ", ".join(f"{count} {reason}" for reason, count in report.invalid.items())
+            print(f"❌ Skipped {sum(report.invalid.values())} of {len(vectors)} vectors ({details})")
+        if not valid_vectors:
+            print("⚠️ No valid vectors to store.")
+            return report
 
-        for vector in vectors:
-            if not isinstance(vector, dict):
-                print(f"❌ Invalid vector format (not dict): {vector}")
-                continue
+        start = time.perf_counter()
+        chunks = self._chunks(valid_vectors, max_records, max_bytes)
+        with ThreadPoolExecutor(max_workers=min(concurrency, len(chunks))) as pool:
+            futures = [
+                pool.submit(self._upsert_chunk, index, number, records, size, retries, backoff)
+                for number, (records, size) in enumerate(chunks)
+            ]
+            report.chunks = [future.result() for future in futures]
+        report.seconds = time.perf_counter() - start
+        if report.stored:
+            with _pool_lock:
+                key = (self.ragProcessor, self.namespace)
+                _store_generations[key] = _store_generations.get(key, 0) + 1
+            print(f"✅ Stored {report.stored} vectors to index '{self.index_name}' (namespace: '{self.namespace}') "
+                  f"in {len(report.chunks)} chunks, {report.seconds:.1f}s ({report.retries} retried requests).")
+        if report.failed:
+            first = next(chunk for chunk in report.chunks if not chunk["ok"])
+            print(f"❌ {len(report.failed)} chunks ({sum(c['records'] for c in report.failed)} vectors) failed "
+                  f"after {retries} attempts, e.g.: {first['error']}")
+        return report
 
-            if "id" not in vector:
-                print(f"❌ Missing 'id' in vector: {vector}")
-                continue
+    def store_generation(self, namespace: str = None) -> int:
+        """How many store() calls in this process have written to the namespace."""
+        return _store_generations.get((self.ragProcessor, namespace or self.namespace), 0)
 
-            # Use field_map to validate required fields
-            expected_field = self.field_map.get("text", "text")
-            if "metadata" not in vector or expected_field not in vector["metadata"]:
-                print(f"❌ Missing '{expected_field}' in vector: {vector['id']}")
-                continue
+    def embed_query(self, text: str, model: str = QUERY_EMBED_MODEL) -> list:
+        """
+        Embed a search query with Pinecone's inference API.
 
-            valid_vectors.append(vector)
+        Args:
+            text: Query text
+            model: Embedding model
 
-        # Debugging: Log valid vectors after validation
-        print(f"Valid vectors after validation: {valid_vectors}")
+        Returns:
+            list: Query vector
+        """
+        inference = getattr(self.ragProcessor, "inference", None)
+        if inference is None:
+            raise RuntimeError("This client has no inference API to embed text (e.g. the local backend); search with vector= instead.")
+        response = inference.embed(model=model, inputs=[text], parameters={"input_type": "query"})
+        return list(_field(response[0], "values"))
 
-        if not valid_vectors:
-            print("⚠️ No valid vectors to store.")
-            return False
+    def search(self, text: str = None, top_k: int = 5, cache=None, model: str = QUERY_EMBED_MODEL,
+               vector: list = None) -> list:
+        """
+        Most similar vectors to a free-text query, or to a precomputed query vector.
 
-        try:
-            index.upsert_records(
-                namespace=self.namespace,
-                records=valid_vectors
-            )
-            print(f"✅ Stored {len(valid_vectors)} vectors to index '{self.index_name}' (namespace: '{self.namespace}').")
-        except Exception as e:
-            raise RuntimeError(f"❌ Failed to store vectors: {e}")
+        Args:
+            text: Query text (embedded with embed_query)
+            top_k: Number of matches
+            cache: QueryCache for query embeddings and recent results (optional; text queries only)
+            model: Model used to embed the query
+            vector: Query vector to use instead of text, e.g. on the local backend,
+                which cannot embed text
+
+        Returns:
+            list: {"id", "score", "metadata"} dicts, best first
+        """
+        if (text is None) == (vector is None):
+            raise ValueError("Pass either text or vector.")
+        generation = self.store_generation()
+        if vector is not None:
+            cache = None
+        elif cache is not None:
+            normalized = cache.normalize(text)
+            result_key = (normalized, top_k, self.namespace)
+            matches = cache.results.get(result_key, generation)
+            if matches is not None:
+                return list(matches)
+            vector = cache.embeddings.get_or_compute((normalized, model), lambda: self.embed_query(text, model))
+        else:
+            vector = self.embed_query(text, model)
 
-        return True
+        response = self.index().query(vector=vector, top_k=top_k, include_metadata=True, namespace=self.namespace)
+        matches = [
+            {"id": _field(match, "id"), "score": _field(match, "score"), "metadata": _field(match, "metadata") or {}}
+            for match in (_field(response, "matches") or [])
+        ]
+        if cache is not None:
+            cache.results.put(result_key, tuple(matches), generation)
+        return matches
+
+    def count(self, index_name: str = None) -> int:
+        """
+        Vectors in the namespace, from a single describe_index_stats() call
+        (Pinecone's counts are eventually consistent, so a fresh upsert may lag).
+        """
+        idx_name = index_name if index_name else self.index_name
+        namespace = idx_name.replace("index", "namespace")
+        namespaces = _field(self.index(idx_name).describe_index_stats(), "namespaces") or {}
+        summary = namespaces.get(namespace)
+        return int(_field(summary, "vector_count", 0)) if summary is not None else 0
 
     def store_one(self, vector: dict):
         return self.store([vector])
@@ -91,33 +370,73 @@ class RAGStorage:
     def retrieve(self, index_name: str = None, limit: int = None, ids: list = None):
         idx_name = index_name if index_name else self.index_name
         namespace = idx_name.replace("index", "namespace")
-        index = self.ragProcessor.Index(idx_name)
+        index = self.index(idx_name)
 
         try:
             if ids:
                 results = index.fetch(ids=ids, namespace=namespace)
-                return results.get("vectors", {})
+                return _field(results, "vectors") or {}
             else:
-                results = index.query(
-                    vector=[0.0] * 1536,  # Dummy vector
-                    top_k=limit or 10000,
-                    include_metadata=True,
-                    namespace=namespace
-                )
-
+                # Scans the namespace; for large ones, iterate over iter_vectors() instead
                 vectors = {}
-                for match in getattr(results, "matches", []):
-                    vectors[match.id] = {
-                        "id": match.id,
-                        "values": getattr(match, "values", []),
-                        "metadata": getattr(match, "metadata", {})
-                    }
+                for vector in islice(self.iter_vectors(idx_name), limit):
+                    vectors[vector["id"]] = vector
                 return vectors
 
         except Exception as e:
             print(f"❌ Error retrieving vectors from index '{idx_name}': {e}")
             return {}
 
+    def iter_vectors(self, index_name: str = None, batch_size: int = 100, include_values: bool = True,
+                     include_metadata: bool = True, ids: list = None, prefix: str = None, concurrency: int = 4):
+        """
+        Stream every vector in a namespace: ids are listed page by page and
+        fetched in batches, a few batches at a time, so memory use does not grow
+        with the namespace.
+
+        Args:
+            index_name: Index to read (defaults to this storage's index)
+            batch_size: Ids per list page and per fetch
+            include_values: Include each vector's values
+            include_metadata: Include each vector's metadata
+            ids: Only these ids (default: every id in the namespace)
+            prefix: Only ids starting with this prefix
+            concurrency: Fetches in flight at once
+
+        Returns:
+            generator: {"id", "values", "metadata"} dicts (without the fields that
+                were excluded). With neither values nor metadata, only ids are
+                listed and nothing is fetched.
+        """
+        idx_name = index_name if index_name else self.index_name
+        namespace = idx_name.replace("index", "namespace")
+        loader = VectorLoader(
+            self.index(idx_name),
+            namespace=namespace,
+            page_size=batch_size,
+            fetch_batch=batch_size,
+            concurrency=concurrency,
+        )
+
+        if not include_values and not include_metadata:
+            pages = [ids[i:i + batch_size] for i in range(0, len(ids), batch_size)] if ids is not None else loader.iter_ids(prefix)
+            for page in pages:
+                for vid in page:
+                    yield {"id": vid}
+            return
+
+        for chunk, fetched in loader.iter_fetched(ids, prefix):
+            for vid in chunk:
+                vector = fetched.get(vid)
+                if vector is None:
+                    continue
+                record = {"id": vid}
+                if include_values:
+                    record["values"] = _field(vector, "values")
+                if include_metadata:
+                    record["metadata"] = _field(vector, "metadata") or {}
+                yield record
+
 
 if __name__ == "__main__":
     index_name = "motivational-index"
@@ -0,0 +1,208 @@
+import json
+import os
+import random
+import sqlite3
+import tempfile
+import time
+import uuid
+import numpy as np
+
+MODELS_DIR = os.path.join(os.path.dirname(__file__), "models")
+
+# Rows per delta file; bounds how much replay_sample() has to read
+DELTA_CHUNK_ROWS = 5000
+# Ids looked up per query against the id index
+ID_LOOKUP_CHUNK = 500
+
+
+class TrainingCheckpoint:
+    """
+    Training data the current model has seen, kept as a series of deltas so the
+    model can be updated with only what arrived since the last checkpoint.
+
+        training/checkpoint.json     model version the deltas were folded into
+        training/delta_<ts>.npz      ids, X and y of one training batch
+        training/ids.sqlite3         every id in the deltas, so unseen() only looks up the new ones
+
+    The id index records the version it was last brought up to; if that is not the
+    checkpoint's version (e.g. a crash between the two writes), it is rebuilt from
+    the deltas.
+    """
+
+    def __init__(self, models_dir: str = MODELS_DIR):
+        self.directory = os.path.join(models_dir, "training")
+        self.path = os.path.join(self.directory, "checkpoint.json")
+        self.ids_path = os.path.join(self.directory, "ids.sqlite3")
+
+    def read(self) -> dict:
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {"version": None, "deltas": [], "rows": 0}
+
+    def _write(self, state: dict):
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.directory, prefix=".checkpoint.", suffix=".json")
+        with os.fdopen(fd, "w") as f:
+            json.dump(state, f, indent=2)
+        os.replace(tmp, self.path)
+
+    def _load(self, name: str):
+        with np.load(os.path.join(self.directory, name), allow_pickle=True) as delta:
+            return delta["ids"], delta["X"], delta["y"]
+
+    def _connect_ids(self):
+        os.makedirs(self.directory, exist_ok=True)
+        conn = sqlite3.connect(self.ids_path)
+        conn.execute("CREATE TABLE IF NOT EXISTS ids (id TEXT PRIMARY KEY)")
+        conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        return conn
+
+    def _index_ids(self, conn, ids, version: str, replace: bool = False):
+        with conn:
+            if replace:
+                conn.execute("DELETE FROM ids")
+            conn.executemany("INSERT OR IGNORE INTO ids (id) VALUES (?)", ((str(i),) for i in ids))
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('version', ?)", (version,))
+
+    def _id_index(self):
+        """Open the id index, rebuilding it from the deltas if it is behind the checkpoint."""
+        state = self.read()
+        conn = self._connect_ids()
+        row = conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+        if state["version"] is not None and (row is None or row[0] != state["version"]):
+            ids = (i for name in state["deltas"] for i in self._load(name)[0].tolist())
+            self._index_ids(conn, ids, state["version"], replace=True)
+        return conn
+
+    def unseen(self, ids, X, y):
+        """
+        Drop rows whose id is already part of the checkpoint. Only the given ids are
+        looked up, so the cost follows the size of the batch, not the history.
+
+        Args:
+            ids: Vector ids
+            X: Features, one row per id
+            y: Labels, one per id
+
+        Returns:
+            tuple: ids, X, y of the new rows only
+        """
+        ids = np.asarray(ids)
+        keys = [str(i) for i in ids.tolist()]
+        seen = set()
+        conn = self._id_index()
+        try:
+            for start in range(0, len(keys), ID_LOOKUP_CHUNK):
+                chunk = keys[start:start + ID_LOOKUP_CHUNK]
+                rows = conn.execute(f"SELECT id FROM ids WHERE id IN ({','.join('?' * len(chunk))})", chunk)
+                seen.update(row[0] for row in rows)
+        finally:
+            conn.close()
+        mask = np.array([k not in seen for k in keys], dtype=bool)
+        return ids[mask], np.asarray(X)[mask], np.asarray(y)[mask]
+
+    def save_deltas(self, ids, X, y) -> list:
+        """
+        Persist a batch of training rows, split into files of DELTA_CHUNK_ROWS.
+
+        Returns:
+            list: File names of the deltas, relative to the training directory
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        ids, X, y = np.asarray(ids), np.asarray(X), np.asarray(y)
+        names = []
+        for start in range(0, len(y), DELTA_CHUNK_ROWS):
+            name = f"delta_{time.strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}.npz"
+            tmp = os.path.join(self.directory, f".{name}")
+            end = start + DELTA_CHUNK_ROWS
+            with open(tmp, "wb") as f:
+                np.savez(f, ids=ids[start:end], X=X[start:end], y=y[start:end])
+            os.replace(tmp, os.path.join(self.directory, name))
+            names.append(name)
+        return names
+
+    def reset(self, version: str, deltas: list, rows: int, ids=None):
+        """
+        Start over from a full retrain: `deltas` hold everything `version` was trained on.
+        Pass the deltas' `ids` to index them without reading the files back.
+        """
+        old = self.read()["deltas"]
+        self._write({"version": version, "deltas": list(deltas), "rows": rows})
+        if ids is not None:
+            conn = self._connect_ids()
+            try:
+                self._index_ids(conn, np.asarray(ids).tolist(), version, replace=True)
+            finally:
+                conn.close()
+        for name in set(old) - set(deltas):
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                pass
+
+    def commit(self, version: str, deltas: list, rows: int, ids=None):
+        """
+        Record that `version` was trained on everything so far plus `deltas`.
+        Pass the deltas' `ids` to add them to the id index.
+        """
+        state = self.read()
+        previous = state["version"]
+        state["version"] = version
+        state["deltas"].extend(deltas)
+        state["rows"] += rows
+        self._write(state)
+        if ids is not None:
+            conn = self._connect_ids()
+            try:
+                row = conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+                # Only extend an index that was current; otherwise the next lookup rebuilds it
+                if row is not None and row[0] == previous:
+                    self._index_ids(conn, np.asarray(ids).tolist(), version)
+            finally:
+                conn.close()
+
+    def load_all(self):
+        """Every row in the checkpoint, for a full retrain."""
+        parts = [self._load(name) for name in self.read()["deltas"]]
+        if not parts:
+            return np.array([]), np.empty((0, 0)), np.array([])
+        return tuple(np.concatenate([part[i] for part in parts]) for i in range(3))
+
+    def replay_sample(self, n: int, classes, seed: int = None):
+        """
+        Sample earlier rows to train alongside a new delta, so new trees still see
+        every known class. Deltas are read in random order and only until the sample
+        is full, so the cost tracks `n`, not the size of the history.
+
+        Args:
+            n: Rows wanted
+            classes: Labels that must appear in the sample where the history has them
+            seed: Random seed
+
+        Returns:
+            tuple: X, y of the sampled rows
+        """
+        rng = random.Random(seed)
+        names = list(self.read()["deltas"])
+        rng.shuffle(names)
+        missing = set(np.asarray(classes).tolist())
+        xs, ys, total = [], [], 0
+        for name in names:
+            if total >= n and not missing:
+                break
+            _, X, y = self._load(name)
+            xs.append(X)
+            ys.append(y)
+            total += len(y)
+            missing -= set(y.tolist())
+        if not xs:
+            return None, None
+        X, y = np.concatenate(xs), np.concatenate(ys)
+
+        order = np.random.default_rng(seed).permutation(len(y))
+        # One row of every class first, then fill up to n at random
+        _, first = np.unique(y[order], return_index=True)
+        keep = np.concatenate([order[first], np.setdiff1d(order, order[first], assume_unique=True)[:max(0, n - len(first))]])
+        return X[keep], y[keep]
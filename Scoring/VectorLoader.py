@@ -0,0 +1,121 @@
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+
+def _field(obj, name, default=None):
+    """Read a field from a dict or a Pinecone response object."""
+    if isinstance(obj, dict):
+        return obj.get(name, default)
+    return getattr(obj, name, default)
+
+
+class VectorLoader:
+    """
+    Bulk-reads vectors from a Pinecone index.
+
+    Ids are enumerated page by page with list_paginated(), fetched in chunks that
+    stay under the per-request fetch limit, several chunks at a time, with retries
+    and exponential backoff. RAGStorage.iter_vectors() streams through it, and
+    FeatureStore.sync_rag() writes what it streams into the training store.
+    """
+
+    def __init__(self, index, namespace: str = "", page_size: int = 100,
+                 fetch_batch: int = 100, concurrency: int = 8, retries: int = 5, backoff: float = 0.5):
+        """
+        Args:
+            index: Pinecone Index (or anything with list_paginated() and fetch())
+            namespace: Namespace to read
+            page_size: Ids per list_paginated() page
+            fetch_batch: Ids per fetch() request
+            concurrency: Fetch requests in flight at once
+            retries: Attempts per request before giving up
+            backoff: Base delay in seconds; doubles with every retry
+        """
+        self.index = index
+        self.namespace = namespace
+        self.page_size = page_size
+        self.fetch_batch = fetch_batch
+        self.concurrency = concurrency
+        self.retries = retries
+        self.backoff = backoff
+        self.report = {}
+        self._report_lock = threading.Lock()
+
+    def _call(self, fn, **kwargs):
+        for attempt in range(self.retries):
+            try:
+                return fn(**kwargs)
+            except Exception:
+                if attempt == self.retries - 1:
+                    raise
+                with self._report_lock:
+                    self.report["retries"] = self.report.get("retries", 0) + 1
+                time.sleep(self.backoff * 2 ** attempt * random.uniform(0.5, 1.5))
+
+    def iter_ids(self, prefix: str = None):
+        """
+        Yield every vector id in the namespace, one page at a time.
+
+        Args:
+            prefix: Only ids starting with this prefix
+
+        Returns:
+            generator: Lists of ids
+        """
+        token = None
+        while True:
+            kwargs = {"namespace": self.namespace, "limit": self.page_size, "pagination_token": token}
+            if prefix:
+                kwargs["prefix"] = prefix
+            page = self._call(self.index.list_paginated, **kwargs)
+            ids = [_field(v, "id") for v in (_field(page, "vectors") or [])]
+            if ids:
+                yield ids
+            pagination = _field(page, "pagination")
+            token = _field(pagination, "next") if pagination else None
+            if not token:
+                return
+
+    def _fetch(self, ids: list) -> dict:
+        response = self._call(self.index.fetch, ids=ids, namespace=self.namespace)
+        return _field(response, "vectors") or {}
+
+    def _chunks(self, ids, prefix):
+        """Fetch-sized id chunks; when listing, chunks go out while later pages are still being listed."""
+        pages = [ids] if ids is not None else self.iter_ids(prefix)
+        pending = []
+        for page in pages:
+            pending.extend(page)
+            while len(pending) >= self.fetch_batch:
+                yield pending[:self.fetch_batch]
+                pending = pending[self.fetch_batch:]
+        if pending:
+            yield pending
+
+    def iter_fetched(self, ids: list = None, prefix: str = None):
+        """
+        Stream vectors a fetch chunk at a time, in listing order, with up to
+        `concurrency` fetches in flight, so memory stays bounded however large the
+        namespace is.
+
+        Args:
+            ids: Vector ids to fetch (default: every id in the namespace)
+            prefix: When listing ids, only those starting with this prefix
+
+        Returns:
+            generator: (chunk ids, {id: vector}) pairs; ids that no longer exist
+                are missing from the dict
+        """
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            window = deque()
+            for chunk in self._chunks(ids, prefix):
+                window.append((chunk, pool.submit(self._fetch, chunk)))
+                if len(window) >= self.concurrency:
+                    chunk, future = window.popleft()
+                    yield chunk, future.result()
+            while window:
+                chunk, future = window.popleft()
+                yield chunk, future.result()
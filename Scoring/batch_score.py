@@ -0,0 +1,26 @@
+import csv
+import os
+import sys
+import time
+from FeatureStore import FeatureStore
+from ModelRegistry import ModelRegistry
+
+# Score every vector in the local feature store with the active model:
+#   python batch_score.py [output.csv]
+output_csv = sys.argv[1] if len(sys.argv) > 1 else os.path.join(os.path.dirname(__file__), "features", "scores.csv")
+
+store = FeatureStore()
+version, model = ModelRegistry().load(compiled=False)
+print(f"📦 Scoring {len(store)} vectors with model version {version}")
+
+start = time.perf_counter()
+scored = 0
+with open(output_csv, mode="w", newline="", encoding="utf-8") as file:
+    writer = csv.writer(file)
+    writer.writerow(["id", "score"])
+    # Batches are views onto the memory map, so memory stays flat however big the store is
+    for ids, X in store.iter_batches():
+        writer.writerows(zip(ids, model.predict(X).tolist()))
+        scored += len(ids)
+
+print(f"✅ Scored {scored} vectors in {time.perf_counter() - start:.1f}s -> {output_csv}")
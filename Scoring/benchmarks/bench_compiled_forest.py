@@ -0,0 +1,70 @@
+"""
+sklearn RandomForestClassifier vs. CompiledForest: exact-match check, single-row
+latency, batch throughput and model footprint.
+
+Usage (from Scoring/):
+    python benchmarks/bench_compiled_forest.py --trees 100 --features 1024
+"""
+
+import argparse
+import os
+import pickle
+import statistics
+import sys
+import time
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from CompiledForest import CompiledForest, verify  # noqa: E402
+
+
+def time_calls(fn, rows, repeat):
+    latencies = []
+    for i in range(repeat):
+        row = rows[i % len(rows)].reshape(1, -1)
+        start = time.perf_counter()
+        fn(row)
+        latencies.append(time.perf_counter() - start)
+    return statistics.median(latencies) * 1000
+
+
+def time_batch(fn, X):
+    start = time.perf_counter()
+    fn(X)
+    return len(X) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--features", type=int, default=1024)
+    parser.add_argument("--trees", type=int, default=100)
+    parser.add_argument("--samples", type=int, default=5000, help="Training rows")
+    parser.add_argument("--batch", type=int, default=10000, help="Rows in the throughput batch")
+    parser.add_argument("--repeat", type=int, default=200, help="Single-row calls to time")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(args.samples, args.features)).astype(np.float32)
+    y = (X[:, :8].sum(axis=1) + rng.normal(size=len(X)) > 0).astype(int) + (X[:, 8] > 1)
+    forest = RandomForestClassifier(n_estimators=args.trees, random_state=0).fit(X, y)
+    compiled = CompiledForest.from_sklearn(forest)
+    X_eval = rng.normal(size=(args.batch, args.features)).astype(np.float32)
+
+    print(f"{args.trees} trees, {len(compiled.feature)} nodes, depth {compiled.max_depth}, {args.features} features\n")
+    print(f"exact match on {args.batch} rows: {verify(forest, compiled, X_eval)}")
+
+    sk_ms = time_calls(forest.predict, X_eval, args.repeat)
+    cf_ms = time_calls(compiled.predict, X_eval, args.repeat)
+    print(f"single-row latency   sklearn {sk_ms:8.3f} ms   compiled {cf_ms:8.3f} ms   ({sk_ms / cf_ms:.1f}x)")
+
+    sk_rps = time_batch(forest.predict, X_eval)
+    cf_rps = time_batch(compiled.predict, X_eval)
+    print(f"batch throughput     sklearn {sk_rps:8.0f} r/s  compiled {cf_rps:8.0f} r/s  ({cf_rps / sk_rps:.2f}x)")
+
+    sk_bytes = len(pickle.dumps(forest))
+    print(f"model footprint      sklearn {sk_bytes / 1e6:8.2f} MB   compiled {compiled.nbytes / 1e6:8.2f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Embedding compression settings: memory, training / prediction time and accuracy.
+
+Generates --rows synthetic embeddings shaped like the pipeline's (--dim wide, unit
+norm, with most of the variance in a few dozen directions) and labels that depend
+on that structure. For each EmbeddingCompressor setting it fits the compressor,
+trains a forest on the compressed training rows, and predicts the test rows from
+raw embeddings (compression included in the timing). Accuracy is reported relative
+to the uncompressed model.
+
+Usage (from Scoring/):
+    python benchmarks/bench_compression.py --rows 10000 --dim 1536
+    python benchmarks/bench_compression.py --settings none pca:64 pca:128:int8
+"""
+
+import argparse
+import os
+import sys
+import time
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.model_selection import train_test_split
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from Compression import EmbeddingCompressor  # noqa: E402
+from fakes import synthetic_embeddings  # noqa: E402
+
+DEFAULT_SETTINGS = [
+    "none", "none:0:float16", "pca:64", "pca:128", "pca:128:float16", "pca:128:int8",
+    "random:256", "random:256:int8",
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--latent", type=int, default=48)
+    parser.add_argument("--classes", type=int, default=5)
+    parser.add_argument("--trees", type=int, default=100)
+    parser.add_argument("--settings", nargs="+", default=DEFAULT_SETTINGS)
+    args = parser.parse_args()
+
+    X, y = synthetic_embeddings(args.rows, args.dim, args.latent, args.classes)
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+
+    print(f"{'setting':<16} {'bytes/vec':>9} {'store MB':>9} {'fit s':>6} {'train s':>8} "
+          f"{'predict s':>9} {'accuracy':>8} {'delta':>7}")
+    baseline = None
+    for spec in args.settings:
+        compressor = EmbeddingCompressor.from_spec(spec)
+
+        start = time.perf_counter()
+        features = compressor.fit(X_train).transform(X_train)
+        fit_seconds = time.perf_counter() - start
+
+        forest = RandomForestClassifier(n_estimators=args.trees, n_jobs=-1, random_state=0)
+        start = time.perf_counter()
+        forest.fit(features, y_train)
+        train_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        predictions = forest.predict(compressor.transform(X_test))
+        predict_seconds = time.perf_counter() - start
+
+        accuracy = float(np.mean(predictions == y_test))
+        baseline = accuracy if baseline is None else baseline
+        per_vector = compressor.bytes_per_vector(args.dim)
+        print(f"{compressor.name:<16} {per_vector:>9} {per_vector * args.rows / 1e6:>9.1f} {fit_seconds:>6.2f} "
+              f"{train_seconds:>8.2f} {predict_seconds:>9.3f} {accuracy:>8.4f} {accuracy - baseline:>+7.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Incremental retraining (Model.update) vs. a full retrain, as labeled batches arrive.
+
+Starts from a model trained on --base rows, then feeds --batches batches of
+--batch-size new rows. After each batch it times Model.update() on just the new rows
+and Model.train() on everything seen so far, and scores both on the same held-out
+test set. Runs against a temporary models directory.
+
+Usage (from Scoring/):
+    python benchmarks/bench_incremental.py --base 5000 --batches 10 --batch-size 1500
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+import numpy as np
+from sklearn.datasets import make_classification
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from Model import Model  # noqa: E402
+
+
+def quiet(fn, *args, **kwargs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return fn(*args, **kwargs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--features", type=int, default=64)
+    parser.add_argument("--classes", type=int, default=5)
+    parser.add_argument("--base", type=int, default=5000)
+    parser.add_argument("--batches", type=int, default=10)
+    parser.add_argument("--batch-size", type=int, default=1500)
+    parser.add_argument("--test-size", type=int, default=2000)
+    parser.add_argument("--new-trees", type=int, default=50)
+    parser.add_argument("--replay-ratio", type=float, default=4.0)
+    args = parser.parse_args()
+
+    total = args.base + args.batches * args.batch_size
+    X, y = make_classification(
+        n_samples=total + args.test_size, n_features=args.features, n_informative=args.features // 3,
+        n_classes=args.classes, random_state=0,
+    )
+    X_test, y_test = X[total:], y[total:]
+    ids = np.array([f"vec-{i}" for i in range(total)])
+
+    with tempfile.TemporaryDirectory() as incremental_dir, tempfile.TemporaryDirectory() as full_dir:
+        incremental = Model(incremental_dir)
+        quiet(incremental.train, X[:args.base], y[:args.base], ids=ids[:args.base])
+        print(f"{'rows':>7}  {'update s':>9}  {'update acc':>10}  {'retrain s':>9}  {'retrain acc':>11}")
+
+        for batch in range(1, args.batches + 1):
+            seen = args.base + batch * args.batch_size
+            new = slice(seen - args.batch_size, seen)
+
+            start = time.perf_counter()
+            quiet(incremental.update, X[new], y[new], ids[new], new_trees=args.new_trees, replay_ratio=args.replay_ratio)
+            update_seconds = time.perf_counter() - start
+            update_accuracy = incremental.model.score(X_test, y_test)
+
+            full = Model(full_dir)
+            start = time.perf_counter()
+            quiet(full.train, X[:seen], y[:seen])
+            retrain_seconds = time.perf_counter() - start
+            retrain_accuracy = full.model.score(X_test, y_test)
+
+            print(f"{seen:>7}  {update_seconds:>9.2f}  {update_accuracy:>10.4f}  {retrain_seconds:>9.2f}  {retrain_accuracy:>11.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Per-call predict vs. micro-batched serving through ModelServer.
+
+N client threads each score single rows against the same RandomForest: first by
+calling predict() directly (one sklearn call per row), then through a ModelServer
+that coalesces concurrent rows into one predict per batch.
+
+Usage (from Scoring/):
+    python benchmarks/bench_model_server.py --clients 32 --requests 2000
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from ModelServer import ModelServer  # noqa: E402
+
+
+def run_clients(score_one, rows, clients):
+    """Split rows across client threads; return (wall seconds, per-request latencies)."""
+    latencies = []
+    lock = threading.Lock()
+
+    def client(chunk):
+        local = []
+        for row in chunk:
+            start = time.perf_counter()
+            score_one(row)
+            local.append(time.perf_counter() - start)
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=client, args=(rows[i::clients],)) for i in range(clients)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return time.perf_counter() - start, latencies
+
+
+def report(name, wall, latencies):
+    latencies = sorted(latencies)
+    p99 = latencies[int(len(latencies) * 0.99) - 1]
+    print(
+        f"{name:<22} {len(latencies) / wall:9.1f} req/s   "
+        f"p50 {statistics.median(latencies) * 1000:7.2f} ms   p99 {p99 * 1000:7.2f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--features", type=int, default=1024)
+    parser.add_argument("--trees", type=int, default=100)
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--max-batch-size", type=int, default=64)
+    parser.add_argument("--max-wait-ms", type=float, default=5.0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(2000, args.features)).astype(np.float32)
+    y = rng.integers(0, 5, size=len(X))
+    model = RandomForestClassifier(n_estimators=args.trees, random_state=0).fit(X, y)
+    rows = list(rng.normal(size=(args.requests, args.features)).astype(np.float32))
+    print(f"{args.requests} single-row requests, {args.clients} clients, {args.trees} trees, {args.features} features\n")
+
+    wall, latencies = run_clients(lambda row: model.predict(row.reshape(1, -1)), rows, args.clients)
+    report("per-call predict", wall, latencies)
+
+    with ModelServer(model, max_batch_size=args.max_batch_size, max_wait_ms=args.max_wait_ms) as server:
+        wall, latencies = run_clients(server.predict, rows, args.clients)
+        stats = server.stats()
+    report("ModelServer", wall, latencies)
+    print(f"\nmean batch size {stats['mean_batch_size']:.1f} over {stats['batches']} batches")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+"""
+Scaling benchmarks for the Scoring package on synthetic 1536-d embeddings.
+
+Runs each benchmark at each scale in a fresh worker process (so peak RSS is per
+case) and records wall time, peak RSS and throughput:
+
+    model_train    Model.train on rows x dim embeddings (saves to a temp registry)
+    model_predict  Model.predict on rows embeddings, model trained on 1000 rows
+    rag_store      RAGStorage.store validation + upsert, against an in-memory FakePinecone
+    vectors_csv    Appending vectors to the pipeline's CSV in batches of 5, as
+                   process_videos_to_rag_storage does
+
+Everything runs offline with fixed seeds. Results are written as JSON (with the
+git commit), and --compare prints the change against an earlier results file.
+
+Usage (from Scoring/):
+    python benchmarks/bench_suite.py
+    python benchmarks/bench_suite.py --scales 1000 10000 --only model_predict rag_store
+    python benchmarks/bench_suite.py --compare benchmarks/results/suite_20251018_101500_3ee0c12.json
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import multiprocessing
+
+SCORING_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(SCORING_DIR)
+sys.path.append(os.path.join(SCORING_DIR, "embedding"))
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+DIM = 1536
+
+
+def _vectors(X, y, offset=0):
+    return [
+        {"id": f"vec-{offset + i:07d}", "values": X[i].tolist(), "metadata": {"text": f"summary {offset + i}", "eval_score": int(y[i])}}
+        for i in range(len(X))
+    ]
+
+
+def bench_model_train(rows, workdir):
+    from Model import Model
+    from fakes import synthetic_embeddings
+    X, y = synthetic_embeddings(rows, DIM)
+    start = time.perf_counter()
+    Model(workdir).train(X, y)
+    return time.perf_counter() - start
+
+
+def bench_model_predict(rows, workdir):
+    from Model import Model
+    from fakes import synthetic_embeddings
+    X, y = synthetic_embeddings(rows, DIM)
+    model = Model(workdir)
+    model.train(*synthetic_embeddings(1000, DIM, seed=1))
+    start = time.perf_counter()
+    model.predict(X)
+    return time.perf_counter() - start
+
+
+def bench_rag_store(rows, workdir):
+    from RAGStorage import RAGStorage
+    from fakes import FakePinecone, synthetic_embeddings
+    vectors = _vectors(*synthetic_embeddings(rows, DIM))
+    storage = RAGStorage("bench-index", field_map={"text": "text"}, client=FakePinecone())
+    start = time.perf_counter()
+    storage.store(vectors)
+    return time.perf_counter() - start
+
+
+def bench_vectors_csv(rows, workdir):
+    from vectors_csv import append_vectors_csv
+    from fakes import synthetic_embeddings
+    X, y = synthetic_embeddings(rows, DIM)
+    output_csv = os.path.join(workdir, "vectors_output.csv")
+    seconds = 0.0
+    # Batches are built as the pipeline builds them, one video at a time; only the writes are timed
+    for i in range(0, rows, 5):
+        batch = _vectors(X[i:i + 5], y[i:i + 5], offset=i)
+        start = time.perf_counter()
+        append_vectors_csv(batch, output_csv)
+        seconds += time.perf_counter() - start
+    return seconds
+
+
+BENCHMARKS = {
+    "model_train": bench_model_train,
+    "model_predict": bench_model_predict,
+    "rag_store": bench_rag_store,
+    "vectors_csv": bench_vectors_csv,
+}
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is in KiB on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _run_case(name, rows, memory_limit_mb):
+    """Runs in a fresh worker process."""
+    if memory_limit_mb:
+        limit = memory_limit_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    baseline = _peak_rss_mb()
+    with tempfile.TemporaryDirectory() as workdir, open(os.devnull, "w") as devnull:
+        with contextlib.redirect_stdout(devnull):
+            seconds = BENCHMARKS[name](rows, workdir)
+    return {"seconds": seconds, "peak_rss_mb": _peak_rss_mb(), "baseline_rss_mb": baseline}
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=SCORING_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(results, previous_path):
+    with open(previous_path) as f:
+        previous = {(r["benchmark"], r["rows"]): r for r in json.load(f)["results"] if "seconds" in r}
+    print(f"\nAgainst {previous_path}:")
+    for result in results:
+        before = previous.get((result["benchmark"], result["rows"]))
+        if before and "seconds" in result:
+            print(f"  {result['benchmark']:<14} {result['rows']:>7}  time x{result['seconds'] / before['seconds']:.2f}  "
+                  f"peak RSS {result['peak_rss_mb'] - before['peak_rss_mb']:+.0f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--only", nargs="+", choices=sorted(BENCHMARKS), default=list(BENCHMARKS))
+    parser.add_argument("--memory-limit-mb", type=int, default=None,
+                        help="Address-space limit per case; a case that exceeds it is recorded as failed")
+    parser.add_argument("--output", default=None, help="Results JSON (default: benchmarks/results/suite_<time>_<commit>.json)")
+    parser.add_argument("--compare", default=None, help="Earlier results JSON to compare against")
+    args = parser.parse_args()
+
+    commit = _git_commit()
+    run = {
+        "commit": commit,
+        "started_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "dim": DIM,
+        "results": [],
+    }
+
+    print(f"{'benchmark':<14} {'rows':>7} {'seconds':>9} {'rows/s':>10} {'peak RSS MB':>11}")
+    for name in args.only:
+        for rows in args.scales:
+            result = {"benchmark": name, "rows": rows}
+            # One process per case, so its peak RSS is its own
+            with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+                try:
+                    result.update(pool.submit(_run_case, name, rows, args.memory_limit_mb).result())
+                except (MemoryError, BrokenProcessPool) as e:
+                    result["error"] = f"{type(e).__name__}: {e}"
+            if "error" in result:
+                print(f"{name:<14} {rows:>7}  failed: {result['error']}")
+            else:
+                result["rows_per_second"] = rows / result["seconds"]
+                print(f"{name:<14} {rows:>7} {result['seconds']:>9.2f} {result['rows_per_second']:>10.0f} "
+                      f"{result['peak_rss_mb']:>11.0f}")
+            run["results"].append(result)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"suite_{time.strftime('%Y%m%d_%H%M%S')}_{commit}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(run, f, indent=2)
+    print(f"💾 Results saved to {output}")
+
+    if args.compare:
+        compare(run["results"], args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+"""
+In-process stand-ins for Pinecone, for benchmarks and offline checks. They follow
+the shape of the Pinecone client's responses (attribute access, `.vectors`,
+`.pagination.next`) closely enough for the Scoring modules. Also generates
+synthetic embeddings, so nothing here needs a network or an API key.
+"""
+
+import hashlib
+import random
+import threading
+import time
+from types import SimpleNamespace
+import numpy as np
+
+
+def synthetic_embeddings(rows: int, dim: int = 1536, latent: int = 48, classes: int = 5, seed: int = 0):
+    """
+    Embeddings shaped like the pipeline's: unit norm, with most of the variance in
+    `latent` directions, and labels (0..classes-1) that depend on that structure.
+
+    Returns:
+        tuple: X (float32, rows x dim), y (int)
+    """
+    rng = np.random.default_rng(seed)
+    z = rng.standard_normal((rows, latent)).astype(np.float32)
+    basis = rng.standard_normal((latent, dim)).astype(np.float32)
+    X = z @ basis + 0.5 * rng.standard_normal((rows, dim)).astype(np.float32)
+    X /= np.linalg.norm(X, axis=1, keepdims=True)
+    signal = z[:, :8] @ rng.standard_normal(8) + 0.3 * rng.standard_normal(rows)
+    y = np.digitize(signal, np.quantile(signal, np.linspace(0, 1, classes + 1)[1:-1]))
+    return X, y
+
+
+class FakeIndexError(Exception):
+    """Raised by FakeIndex to simulate throttling or a dropped connection."""
+
+
+class FakeIndex:
+    """
+    A namespace of vectors held in memory, with Pinecone's list/fetch limits,
+    optional per-request latency and a random failure rate.
+    """
+
+    MAX_FETCH_IDS = 1000
+    MAX_LIST_LIMIT = 100
+    MAX_UPSERT_RECORDS = 96
+
+    def __init__(self, vectors: dict = None, latency: float = 0.0, failure_rate: float = 0.0, seed: int = 0):
+        """
+        Args:
+            vectors: id -> {"values": [...], "metadata": {...}}
+            latency: Seconds each request takes
+            failure_rate: Probability that a request raises FakeIndexError
+            seed: Seed for the failure draws
+        """
+        self.vectors = dict(vectors or {})
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.requests = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def random(cls, n: int, dim: int, unlabeled: float = 0.0, label_field: str = "eval_score", seed: int = 0, **kwargs):
+        """A fake index of n random vectors; a fraction `unlabeled` has no label."""
+        rng = np.random.default_rng(seed)
+        values = rng.normal(size=(n, dim)).astype(np.float32)
+        vectors = {}
+        for i in range(n):
+            metadata = {"text": f"summary {i}"}
+            if rng.random() >= unlabeled:
+                metadata[label_field] = float(rng.integers(0, 101))
+            vectors[f"vec-{i:07d}"] = {"values": values[i].tolist(), "metadata": metadata}
+        return cls(vectors, seed=seed, **kwargs)
+
+    def _request(self):
+        with self._lock:
+            self.requests += 1
+            fail = self._random.random() < self.failure_rate
+        if self.latency:
+            time.sleep(self.latency)
+        if fail:
+            raise FakeIndexError("Too Many Requests")
+
+    def list_paginated(self, prefix: str = None, limit: int = 100, pagination_token: str = None, namespace: str = ""):
+        self._request()
+        limit = min(limit, self.MAX_LIST_LIMIT)
+        ids = sorted(vid for vid in self.vectors if not prefix or vid.startswith(prefix))
+        start = int(pagination_token or 0)
+        page = ids[start:start + limit]
+        token = str(start + limit) if start + limit < len(ids) else None
+        return SimpleNamespace(
+            vectors=[SimpleNamespace(id=vid) for vid in page],
+            pagination=SimpleNamespace(next=token) if token else None,
+            namespace=namespace,
+        )
+
+    def describe_index_stats(self):
+        self._request()
+        dimension = len(next(iter(self.vectors.values()))["values"]) if self.vectors else 0
+        return SimpleNamespace(
+            dimension=dimension,
+            total_vector_count=len(self.vectors),
+            namespaces={"": SimpleNamespace(vector_count=len(self.vectors))},
+        )
+
+    def fetch(self, ids: list, namespace: str = ""):
+        if len(ids) > self.MAX_FETCH_IDS:
+            raise FakeIndexError(f"fetch accepts at most {self.MAX_FETCH_IDS} ids, got {len(ids)}")
+        self._request()
+        return SimpleNamespace(
+            vectors={
+                vid: SimpleNamespace(id=vid, values=self.vectors[vid]["values"], metadata=self.vectors[vid].get("metadata"))
+                for vid in ids if vid in self.vectors
+            },
+            namespace=namespace,
+        )
+
+    def upsert(self, vectors: list, namespace: str = ""):
+        self._request()
+        for vector in vectors:
+            self.vectors[vector["id"]] = {"values": list(vector["values"]), "metadata": vector.get("metadata", {})}
+        return SimpleNamespace(upserted_count=len(vectors))
+
+    def query(self, vector: list, top_k: int = 10, namespace: str = "", include_values: bool = False,
+              include_metadata: bool = False, **kwargs):
+        self._request()
+        ids = list(self.vectors)
+        if not ids:
+            return SimpleNamespace(matches=[], namespace=namespace)
+        X = np.array([self.vectors[vid]["values"] for vid in ids], dtype=np.float32)
+        q = np.asarray(vector, dtype=np.float32)
+        scores = X @ q / np.maximum(np.linalg.norm(X, axis=1) * np.linalg.norm(q), 1e-12)
+        return SimpleNamespace(
+            matches=[
+                SimpleNamespace(
+                    id=ids[i],
+                    score=float(scores[i]),
+                    values=self.vectors[ids[i]]["values"] if include_values else [],
+                    metadata=self.vectors[ids[i]].get("metadata") if include_metadata else None,
+                )
+                for i in np.argsort(-scores)[:top_k]
+            ],
+            namespace=namespace,
+        )
+
+    def upsert_records(self, namespace: str, records: list):
+        if len(records) > self.MAX_UPSERT_RECORDS:
+            raise FakeIndexError(f"upsert_records accepts at most {self.MAX_UPSERT_RECORDS} records, got {len(records)}")
+        self._request()
+        for record in records:
+            self.vectors[record["id"]] = {"values": list(record.get("values") or []), "metadata": record.get("metadata", {})}
+        return SimpleNamespace(upserted_count=len(records))
+
+
+class FakeInference:
+    """Deterministic stand-in for Pinecone's inference API: the same text always gets the same vector."""
+
+    def __init__(self, dim: int = 1024, latency: float = 0.0):
+        self.dim = dim
+        self.latency = latency
+        self.requests = 0
+
+    def embed(self, model: str, inputs: list, parameters: dict = None):
+        self.requests += 1
+        if self.latency:
+            time.sleep(self.latency)
+        embeddings = []
+        for text in inputs:
+            seed = int.from_bytes(hashlib.sha256(f"{model}:{text}".encode()).digest()[:8], "little")
+            values = np.random.default_rng(seed).standard_normal(self.dim).astype(np.float32)
+            embeddings.append(SimpleNamespace(values=values.tolist()))
+        return embeddings
+
+
+class FakePinecone:
+    """Stand-in for the Pinecone client: every index it hands out is a FakeIndex."""
+
+    def __init__(self, **index_kwargs):
+        """
+        Args:
+            index_kwargs: Passed to FakeIndex (latency, failure_rate, seed) for new indexes
+        """
+        self.index_kwargs = index_kwargs
+        self.indexes = {}
+        self.inference = FakeInference()
+
+    def has_index(self, name: str) -> bool:
+        return name in self.indexes
+
+    def create_index_for_model(self, name: str, **kwargs):
+        self.indexes.setdefault(name, FakeIndex(**self.index_kwargs))
+
+    def Index(self, name: str) -> FakeIndex:
+        return self.indexes.setdefault(name, FakeIndex(**self.index_kwargs))
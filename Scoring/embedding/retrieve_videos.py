@@ -62,6 +62,8 @@ def run_query_test(query: str = "motivational interviewing techniques"):
             print("🔍 Query Results:")
             for idx, row in results.iterrows():
                 print(f"   {idx+1}. {row['video_title']} (Score: {row['similarity_score']:.3f})")
+            stats = pipeline.query_cache.stats()
+            print(f"   Cache hit ratio: embeddings {stats['embedding_hit_ratio']:.0%}, results {stats['result_hit_ratio']:.0%}")
         else:
             print("No results found")
             
@@ -14,6 +14,8 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
 from videos.Summarizer import Summarizer
 from ground_truth.gemini_evaluation import GeminiEvaluator
 from RAGStorage import RAGStorage
+from QueryCache import QueryCache
+from vectors_csv import VECTORS_CSV, append_vectors_csv
 
 class VectorEmbeddingPipeline:
     def __init__(self):
@@ -51,6 +53,9 @@ class VectorEmbeddingPipeline:
             print(f"RAGStorage initialization failed: {e}")
             raise ValueError(f"Failed to initialize RAGStorage: {e}")
         
+        # Trainees repeat the same few queries; cache their embeddings and recent results
+        self.query_cache = QueryCache()
+
         # Verify TwelveLabs API key
         twelve_labs_key = os.getenv("TWELVE_LABS_API_KEY", '')
         if not twelve_labs_key:
@@ -59,17 +64,37 @@ class VectorEmbeddingPipeline:
     def ensure_rag_storage(self):
         """Ensure RAGStorage is properly initialized"""
         try:
-            # RAGStorage handles index creation in its constructor
-            # Test the connection by trying to retrieve (with limit 1 to avoid large data)
-            test_vectors = self.rag_storage.retrieve(limit=1)
+            # RAGStorage creates the index on first use
+            # Test the connection with one stats call; the namespace count comes with it
+            vector_count = self.rag_storage.count()
             print(f"✅ RAG Storage ready for index: {self.index_name}")
-            print(f"   Current vector count: {len(test_vectors) if test_vectors else 0}")
+            print(f"   Current vector count: {vector_count}")
             return True
             
         except Exception as e:
             print(f"Error with RAG Storage: {e}")
             return False
     
+    def ensure_pinecone_index(self):
+        """Alias of ensure_rag_storage, used by retrieve_videos.py"""
+        return self.ensure_rag_storage()
+
+    def query_similar_videos(self, query: str, top_k: int = 5) -> pd.DataFrame:
+        """
+        Find the stored videos most similar to a text query (cached, see QueryCache)
+        """
+        matches = self.rag_storage.search(query, top_k=top_k, cache=self.query_cache)
+        return pd.DataFrame([
+            {
+                'video_id': match['id'],
+                'video_title': match['metadata'].get('video_title', ''),
+                'similarity_score': match['score'],
+                'eval_score': match['metadata'].get('eval_score'),
+                'video_url': match['metadata'].get('video_url', ''),
+            }
+            for match in matches
+        ], columns=['video_id', 'video_title', 'similarity_score', 'eval_score', 'video_url'])
+
     def get_video_data(self, video_url: str, video_title: str) -> Optional[Dict[str, Any]]:
         """
         Get comprehensive video data: embeddings, Pegasus summary, and Gemini evaluation
@@ -134,21 +159,13 @@ class VectorEmbeddingPipeline:
                 if summary_results and hasattr(summary_results, 'summary'):
                     video_data['pegasus_summary'] = summary_results.summary
                 
-                # Get embeddings using search/generate
-                search_results = self.summarizer.client.index.video.retrieve(
-                    index_id=index_id,
-                    id=task_status.video_id,
-                    embedding_option=["visual-text", "audio"],
-                )
-
-                # Extract embeddings from search results
-                if search_results and hasattr(search_results, 'data') and search_results.data:
-                    embeddings = search_results.embedding
-                    if embeddings is not None:
-                        video_data['embeddings'] = embeddings
-                        print(f"Got embeddings for: {video_title}")
-                    else: 
-                        print(f"No embeddings found for: {video_title}")
+                # Get embeddings (shared with Summarizer.embed_file, which scores uploaded sessions)
+                embeddings = self.summarizer.video_embedding(index_id, task_status.video_id)
+                if embeddings is not None:
+                    video_data['embeddings'] = embeddings
+                    print(f"Got embeddings for: {video_title}")
+                else: 
+                    print(f"No embeddings found for: {video_title}")
                  
                 
             except Exception as e:
@@ -187,10 +204,26 @@ class VectorEmbeddingPipeline:
             print(f"Error processing video {video_title}: {e}")
             return None
     
+    def store_vectors_csv(self, vectors: List[Dict[str, Any]], output_csv: str = VECTORS_CSV) -> int:
+        """
+        Append a batch of prepared vectors to the local CSV (see vectors_csv.py)
+        """
+        written = append_vectors_csv(vectors, output_csv)
+        print(f"Stored batch of {written} vectors to CSV: {output_csv}")
+        return written
+
     def create_video_id(self, video_url: str) -> str:
         """Create a unique ID for the video based on URL"""
         return hashlib.md5(video_url.encode()).hexdigest()
     
+    def mark_store_failed(self, results: List[Dict[str, Any]], video_ids: List[str], error: str):
+        """Flip prepared videos whose vectors were not stored to 'store_failed'."""
+        video_ids = set(video_ids)
+        for result in results:
+            if result['video_id'] in video_ids and result['status'] == 'success':
+                result['status'] = 'store_failed'
+                result['error'] = error
+
     def process_videos_to_rag_storage(self) -> pd.DataFrame:
         """
         Process all videos and upload embeddings to RAGStorage
@@ -267,37 +300,16 @@ class VectorEmbeddingPipeline:
                 try:
                     if len(vectors_to_store) >= 5:
                         # Instead of storing to Pinecone, write vectors to a CSV file
-                        import csv
-                        output_csv = os.path.join(os.path.dirname(__file__), 'vectors_output.csv')
-
-                        # Write headers if the file does not exist
-                        if not os.path.exists(output_csv):
-                            with open(output_csv, mode='w', newline='', encoding='utf-8') as file:
-                                writer = csv.DictWriter(file, fieldnames=['id', 'values', 'metadata'])
-                                writer.writeheader()
-
-                        # Append vectors to the CSV file
-                        with open(output_csv, mode='a', newline='', encoding='utf-8') as file:
-                            writer = csv.DictWriter(file, fieldnames=['id', 'values', 'metadata'])
-                            for vector in vectors_to_store:
-                                writer.writerow(vector)
-
-                        print(f"Stored batch of {len(vectors_to_store)} vectors to CSV: {output_csv}")
+                        self.store_vectors_csv(vectors_to_store)
                         vectors_to_store = []
 
                                     # Rate limiting
                     time.sleep(2)
                 except Exception as e:
-                    failed_uploads += 1
-                    print(f"❌ Failed to store vector for {video_title}: {e}")
-                    results.append({
-                        'video_id': video_id,
-                        'video_url': video_url,
-                        'video_title': video_title,
-                        'status': 'store_failed',
-                        'embedding_dimension': 0,
-                        'error': str(e)
-                    })
+                    # Nothing in the batch was written, not just this video
+                    print(f"❌ Failed to store batch of {len(vectors_to_store)} vectors ending with {video_title}: {e}")
+                    self.mark_store_failed(results, [v["id"] for v in vectors_to_store], str(e))
+                    vectors_to_store = []
                     continue
                 
                 
@@ -315,11 +327,19 @@ class VectorEmbeddingPipeline:
         
         # Store any remaining vectors
         if vectors_to_store:
-            self.rag_storage.store(vectors_to_store)
-            print(f"Stored final batch of {len(vectors_to_store)} vectors")
-        
+            report = self.rag_storage.store(vectors_to_store)
+            print(f"Stored final batch of {report.stored}/{len(vectors_to_store)} vectors")
+            # Invalid vectors and chunks that failed every retry
+            unstored = [v["id"] for v in vectors_to_store if v["id"] not in report.stored_ids]
+            if unstored:
+                errors = [chunk["error"] for chunk in report.failed] or [f"invalid vectors: {report.invalid}"]
+                self.mark_store_failed(results, unstored, errors[0])
+
+        successful_uploads = sum(1 for result in results if result['status'] == 'success')
+        failed_uploads = len(results) - successful_uploads
         print(f"\nProcessing Summary:")
         print(f"Successful uploads: {successful_uploads}")
+        print(f"Failed uploads: {failed_uploads}")
         
         # Create results DataFrame
         results_df = pd.DataFrame(results)
@@ -0,0 +1,26 @@
+import csv
+import os
+
+VECTORS_CSV = os.path.join(os.path.dirname(__file__), 'vectors_output.csv')
+FIELDNAMES = ['id', 'values', 'metadata']
+
+
+def append_vectors_csv(vectors: list, output_csv: str = VECTORS_CSV) -> int:
+    """
+    Append a batch of vectors to the pipeline's CSV, writing the header first if
+    the file does not exist yet.
+
+    Args:
+        vectors: Dicts with id, values and metadata
+        output_csv: CSV file to append to
+
+    Returns:
+        int: Rows written
+    """
+    write_header = not os.path.exists(output_csv)
+    with open(output_csv, mode='a', newline='', encoding='utf-8') as file:
+        writer = csv.DictWriter(file, fieldnames=FIELDNAMES)
+        if write_header:
+            writer.writeheader()
+        writer.writerows(vectors)
+    return len(vectors)
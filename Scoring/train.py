@@ -1,56 +1,70 @@
 import os
+import sys
 import time
 import numpy as np
-import pinecone
-import joblib
 from dotenv import load_dotenv
+from FeatureStore import FeatureStore, VECTORS_CSV
 from Model import Model  # Your existing RandomForestClassifier wrapper
+from Compression import EmbeddingCompressor
+from ModelRegistry import ModelRegistry, version_of
 
 # Load environment variables
 load_dotenv()
 
-# Initialize Pinecone
-pinecone.init(
-    api_key=os.getenv("PINECONE_API_KEY"),
-    environment="us-east-1-aws"
-)
+INDEX_NAME = "motivational-interviewing-videos"
 
-# Load Pinecone index
-INDEX_NAME = "your-index-name"
-index = pinecone.Index(INDEX_NAME)
+# The new version becomes the active one (what ModelServer and the feedback jobs load);
+# --no-activate only registers it, to be promoted with `python ModelRegistry.py activate <version>`
+activate = "--no-activate" not in sys.argv
 
-# Example list of known vector IDs
-ids = ["id1", "id2", "id3"]  # Replace with actual IDs, or dynamically fetch from your DB
+store = FeatureStore()
 
-# Fetch embeddings and metadata from Pinecone
-response = index.fetch(ids=ids)
-
-vectors = []
-labels = []
-
-for vid, vdata in response.vectors.items():
-    if 'values' not in vdata or 'metadata' not in vdata:
-        continue
-    vectors.append(vdata['values'])
-    label = vdata['metadata'].get('label')
-    if label is not None:
-        labels.append(label)
+# Refresh the local feature store on request, or when it has never been filled
+if "--sync" in sys.argv or store.rows == 0:
+    start = time.perf_counter()
+    if os.path.exists(VECTORS_CSV):
+        synced = store.sync_csv(VECTORS_CSV)
+        source = VECTORS_CSV
     else:
-        print(f"⚠️ Warning: Missing label for vector ID {vid}")
+        from RAGStorage import RAGStorage
+        synced = store.sync_rag(RAGStorage(index_name=INDEX_NAME))
+        source = f"Pinecone index '{INDEX_NAME}'"
+    print(f"🔄 Synced {synced} vectors from {source} in {time.perf_counter() - start:.1f}s")
+
+# Memory-mapped views: nothing is copied or fetched over the network here
+start = time.perf_counter()
+ids, X, y = store.training_set()
+print(f"📂 Loaded {len(ids)} labeled vectors from the feature store in {(time.perf_counter() - start) * 1000:.1f} ms")
 
-# Convert to numpy arrays
-X = np.array(vectors)
-y = np.array(labels)
+if len(X) == 0:
+    raise ValueError("No labeled vectors in the feature store. Run with --sync, and check the eval_score metadata.")
 
-if len(X) == 0 or len(y) == 0:
-    raise ValueError("No valid vectors or labels found. Check your Pinecone index and metadata.")
+# Incremental retraining: --update adds trees for rows added to the store since the
+# last checkpoint (see Model.update); otherwise train from scratch on every row
+if "--update" in sys.argv:
+    if "--compress" in sys.argv:
+        print("⚠️ --compress is ignored with --update; updates keep the compressor of the last full train")
+    result = Model().update(X, np.rint(y).astype(int), ids, activate=activate)
+    if result is None:
+        sys.exit(0)
+    val_acc, test_acc, model_path = result
+else:
+    # Optional embedding compression, e.g. --compress pca:128:int8 (see Compression.py)
+    compressor = None
+    if "--compress" in sys.argv:
+        compressor = EmbeddingCompressor.from_spec(sys.argv[sys.argv.index("--compress") + 1])
 
-# Train the model and persist it
-model = Model()
-val_acc, test_acc, model_path = model.train(X, y)  # Ensure Model.train() returns model_path
+    # Train the model and persist it
+    model = Model(compressor=compressor)
+    val_acc, test_acc, model_path = model.train(X, np.rint(y).astype(int), activate=activate, ids=ids)
 
 # Print summary
 print(f"\n✅ Training complete")
 print(f"📊 Validation Accuracy: {val_acc:.4f}")
 print(f"📊 Test Accuracy: {test_acc:.4f}")
 print(f"💾 Model saved to: {model_path}")
+active = ModelRegistry().active_version()
+if active == version_of(model_path):
+    print(f"🚀 Active model version: {active}")
+else:
+    print(f"⏸️ Registered without activating; still serving {active}. Promote with: python ModelRegistry.py activate {version_of(model_path)}")
@@ -109,6 +109,53 @@ class Summarizer:
             "task_id": task.id
         }
 
+    def video_embedding(self, index_id: str, video_id: str):
+        """Embedding of an indexed video (visual-text and audio), or None if it has none."""
+        search_results = self.client.index.video.retrieve(
+            index_id=index_id,
+            id=video_id,
+            embedding_option=["visual-text", "audio"],
+        )
+        if search_results and hasattr(search_results, 'data') and search_results.data:
+            return search_results.embedding
+        return None
+
+    def embed_file(self, path: str, index_name: str = "session_upload", max_wait: float = 300):
+        """
+        Upload a local video to a temporary index and return its embedding, the
+        same embedding the pipeline stores for the training videos.
+
+        Args:
+            path: Video file
+            index_name: Prefix of the temporary index (deleted afterwards)
+            max_wait: Seconds to wait for indexing
+
+        Returns:
+            The video's embedding
+        """
+        index_id = self.ensure_index(f"{index_name}_{time.strftime('%Y%m%d_%H%M%S')}")
+        if not index_id:
+            raise RuntimeError(f"Could not create index '{index_name}'")
+        try:
+            with open(path, "rb") as f:
+                task = self.client.task.create(index_id=index_id, file=f)
+            deadline = time.monotonic() + max_wait
+            while True:
+                task_status = self.client.task.retrieve(task.id)
+                if task_status.status == "ready":
+                    break
+                if task_status.status == "failed":
+                    raise RuntimeError(f"Indexing failed for {os.path.basename(path)}")
+                if time.monotonic() > deadline:
+                    raise TimeoutError(f"Indexing {os.path.basename(path)} took longer than {max_wait:.0f}s")
+                time.sleep(2)
+            embedding = self.video_embedding(index_id, task_status.video_id)
+            if embedding is None:
+                raise RuntimeError(f"No embedding returned for {os.path.basename(path)}")
+            return embedding
+        finally:
+            self.delete_index(index_id)
+
     def drive(self):
         # Use the correct Google Drive API scope for reading files
         SCOPES = ['https://www.googleapis.com/auth/drive.readonly']
@@ -0,0 +1,102 @@
+"""
+Cold-start time of the API: how long `import main` takes in a fresh interpreter, and
+how long a fresh uvicorn process takes to answer /healthz and /readyz.
+
+Usage (from backend/):
+    python benchmarks/bench_startup.py --runs 5
+"""
+
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+IMPORT_SNIPPET = """
+import sys, time
+start = time.perf_counter()
+import main
+elapsed = time.perf_counter() - start
+heavy = [m for m in ("supabase", "sklearn", "pandas", "numpy") if m in sys.modules]
+print(elapsed, ",".join(heavy))
+"""
+
+
+def time_import():
+    out = subprocess.run(
+        [sys.executable, "-c", IMPORT_SNIPPET], cwd=BACKEND_DIR, capture_output=True, text=True, check=True,
+    ).stdout.strip().splitlines()[-1]
+    elapsed, heavy = (out.split(" ", 1) + [""])[:2]
+    return float(elapsed), heavy
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_for(url, deadline):
+    while time.perf_counter() < deadline:
+        try:
+            with urllib.request.urlopen(url, timeout=1) as response:
+                if response.status == 200:
+                    return True
+        except (urllib.error.URLError, ConnectionError):
+            pass
+        time.sleep(0.01)
+    return False
+
+
+def time_server(timeout):
+    port = free_port()
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        base = f"http://127.0.0.1:{port}"
+        healthy = wait_for(f"{base}/healthz", start + timeout)
+        healthz = time.perf_counter() - start if healthy else None
+        ready = healthy and wait_for(f"{base}/readyz", start + timeout)
+        readyz = time.perf_counter() - start if ready else None
+        return healthz, readyz
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def summary(values):
+    values = [v for v in values if v is not None]
+    if not values:
+        return "n/a"
+    return f"median {statistics.median(values):.3f}s  min {min(values):.3f}s  max {max(values):.3f}s"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--timeout", type=float, default=30.0, help="Seconds to wait for /healthz and /readyz")
+    args = parser.parse_args()
+
+    imports, heavy = [], ""
+    for _ in range(args.runs):
+        elapsed, heavy = time_import()
+        imports.append(elapsed)
+    print(f"import main:        {summary(imports)}")
+    print(f"  heavy modules loaded at import: {heavy or 'none'}")
+
+    servers = [time_server(args.timeout) for _ in range(args.runs)]
+    print(f"process -> /healthz: {summary([h for h, _ in servers])}")
+    print(f"process -> /readyz:  {summary([r for _, r in servers])}")
+
+
+if __name__ == "__main__":
+    main()
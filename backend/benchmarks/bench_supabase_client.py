@@ -0,0 +1,134 @@
+"""
+Throughput of the sync Supabase client (run on Starlette's threadpool, the way a
+plain `def` route is served) versus the pooled async client used by the routers.
+
+A local stand-in server answers every PostgREST request after a fixed delay, so
+the numbers only reflect how many calls the process can keep in flight.
+
+Usage (from backend/):
+    python benchmarks/bench_supabase_client.py --requests 2000 --concurrency 200 --latency-ms 100
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+import anyio
+
+BODY = json.dumps([{"sim_id": 1, "name": "Breaking bad news", "category": "medical"}]).encode()
+
+
+class StandInServer:
+    """Minimal HTTP/1.1 keep-alive server that replies to every request after `latency` seconds.
+
+    Runs in its own process so it does not compete with the client for the GIL.
+    """
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self._port = multiprocessing.Queue()
+        self._process = multiprocessing.Process(target=self._run, daemon=True)
+
+    def start(self):
+        self._process.start()
+        return f"http://127.0.0.1:{self._port.get()}"
+
+    def stop(self):
+        self._process.terminate()
+
+    def _run(self):
+        async def serve():
+            server = await asyncio.start_server(self._handle, "127.0.0.1", 0, backlog=4096)
+            self._port.put(server.sockets[0].getsockname()[1])
+            await server.serve_forever()
+
+        asyncio.run(serve())
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                length = 0
+                for line in head.split(b"\r\n"):
+                    if line.lower().startswith(b"content-length:"):
+                        length = int(line.split(b":", 1)[1])
+                if length:
+                    await reader.readexactly(length)
+                await asyncio.sleep(self.latency)
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                    b"Content-Length: %d\r\n\r\n" % len(BODY) + BODY
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+
+async def run_sync_threadpool(total: int, concurrency: int):
+    from utils.supabase_client import get_supabase
+
+    supabase = get_supabase()
+
+    def query():
+        return supabase.table("simulations").select("*").execute()
+
+    limit = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with limit:
+            # Same path Starlette takes for a plain `def` endpoint.
+            await anyio.to_thread.run_sync(query)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(total)))
+    return time.perf_counter() - start
+
+
+async def run_async_client(total: int, concurrency: int):
+    from utils.supabase_client import get_async_supabase, close_async_supabase
+
+    supabase = await get_async_supabase()
+    limit = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with limit:
+            await supabase.table("simulations").select("*").execute()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(total)))
+    elapsed = time.perf_counter() - start
+    await close_async_supabase()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--latency-ms", type=float, default=100.0)
+    args = parser.parse_args()
+
+    server = StandInServer(args.latency_ms / 1000)
+    url = server.start()
+    os.environ["NEXT_PUBLIC_SUPABASE_URL"] = url
+    os.environ["NEXT_PUBLIC_SUPABASE_ANON_KEY"] = "bench.stand-in.key"
+    sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+    results = {}
+    for name, runner in (("sync+threadpool", run_sync_threadpool), ("async", run_async_client)):
+        elapsed = asyncio.run(runner(args.requests, args.concurrency))
+        results[name] = args.requests / elapsed
+        print(f"{name:>16}: {args.requests} requests in {elapsed:.2f}s -> {results[name]:.0f} req/s")
+
+    server.stop()
+    print(f"\nasync / sync throughput: {results['async'] / results['sync+threadpool']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
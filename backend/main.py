@@ -1,14 +1,63 @@
-from fastapi import FastAPI
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from routers import simulations, sessions, analytics, profiles
-from utils.supabase_client import supabase
+from fastapi.responses import JSONResponse, PlainTextResponse
+from routers import simulations, sessions, analytics, profiles, admin
+from utils.supabase_client import get_async_supabase, close_async_supabase
+from utils.pagination import NEXT_CURSOR_HEADER
+from utils.catalog import start_catalog_listener, stop_catalog_listener, build_search_index
+from utils.write_behind import ANALYTICS_WRITE_BEHIND, analytics_buffer
+from utils.jobs import feedback_jobs
+from utils.cache import catalog_cache
+from utils.singleflight import read_coalescer
+from utils.metrics import registry, Gauge, http_request_duration, http_requests, http_in_flight
 
-app = FastAPI()
+
+# Warm-up progress reported by /readyz
+startup_state = {"supabase_client": False, "search_index": "pending", "warm": False}
+
+
+async def warm_up():
+    """Build the Supabase client, search index and catalog listener after the server is already accepting requests."""
+    try:
+        await get_async_supabase()
+        startup_state["supabase_client"] = True
+        try:
+            await build_search_index()
+            startup_state["search_index"] = "ready"
+        except Exception as e:
+            # Search falls back to the database until the index is rebuilt
+            startup_state["search_index"] = "fallback"
+            print(f"Search index not built, falling back to database search: {e}")
+        await start_catalog_listener()
+    finally:
+        startup_state["warm"] = True
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    warm_task = asyncio.create_task(warm_up())
+    if ANALYTICS_WRITE_BEHIND:
+        await analytics_buffer.start()
+    await feedback_jobs.resume()
+    yield
+    await feedback_jobs.shutdown()
+    warm_task.cancel()
+    if ANALYTICS_WRITE_BEHIND:
+        await analytics_buffer.stop()
+    await stop_catalog_listener()
+    await close_async_supabase()
+
+
+app = FastAPI(lifespan=lifespan)
 
 app.include_router(simulations.router, prefix="/simulations", tags=["simulations"])
 app.include_router(profiles.router, prefix="/profiles", tags=["profiles"])
 app.include_router(sessions.router, prefix="/sessions", tags=["sessions"]) 
 app.include_router(analytics.router, prefix="/analytics", tags=["analytics"]) 
+app.include_router(admin.router, prefix="/admin", tags=["admin"])
 
 app.add_middleware(
     CORSMiddleware,
@@ -16,9 +65,74 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
 
+def route_template(scope) -> str:
+    """Path template of the matched route, e.g. /simulations/{sim_id}."""
+    route = scope.get("route")
+    return route.path if route is not None else "unmatched"
+
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    method = request.method
+    http_in_flight.inc(method)
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        elapsed = time.perf_counter() - start
+        http_in_flight.dec(method)
+        # Label by route template, not raw path, to bound cardinality
+        route = route_template(request.scope)
+        http_request_duration.observe(method, route, value=elapsed)
+        http_requests.inc(method, route, str(status))
+
+
+def component_gauges():
+    gauges = []
+    for name, stats in (("catalog_cache", catalog_cache.stats()), ("analytics_write_behind", analytics_buffer.stats())):
+        for key, value in stats.items():
+            gauge = Gauge(f"{name}_{key}", f"{name} {key.replace('_', ' ')}")
+            gauge.set(value=value)
+            gauges.append(gauge)
+    coalesced = Gauge("singleflight_calls", "Coalesced reads by outcome", ("read", "outcome"))
+    for read, counts in read_coalescer.stats()["reads"].items():
+        coalesced.set(read, "upstream", value=counts["upstream"])
+        coalesced.set(read, "deduplicated", value=counts["deduplicated"])
+    gauges.append(coalesced)
+    return gauges
+
+
+registry.add_collector(component_gauges)
+
+
+# Liveness: the process is up and serving
+@app.get("/healthz")
+def healthz():
+    return {"status": "ok"}
+
+# Readiness: warm-up has finished and the Supabase client exists
+@app.get("/readyz")
+def readyz():
+    ready = startup_state["warm"] and startup_state["supabase_client"]
+    return JSONResponse(
+        {"ready": ready, **startup_state},
+        status_code=200 if ready else 503,
+    )
+
+
+# Prometheus scrape endpoint
+@app.get("/metrics")
+def metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+
 @app.get("/")
 def start():
     return {"hello"}
\ No newline at end of file
@@ -0,0 +1,47 @@
+import os
+from fastapi import APIRouter, HTTPException, Depends, Header
+from utils.cache import catalog_cache
+from utils.singleflight import read_coalescer
+from utils.write_behind import analytics_buffer
+from utils.catalog import invalidate_catalog, build_search_index, refresh_simulation
+
+ADMIN_API_KEY = os.getenv("ADMIN_API_KEY")
+
+
+def require_admin(x_admin_key: str = Header(None)):
+    # Admin routes stay disabled unless ADMIN_API_KEY is configured
+    if not ADMIN_API_KEY or x_admin_key != ADMIN_API_KEY:
+        raise HTTPException(status_code=403, detail="Forbidden")
+
+
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+# Catalog cache hit/miss counters
+@router.get("/cache/")
+async def catalog_cache_stats():
+    return catalog_cache.stats()
+
+# Call after editing the simulations table so the change is served immediately.
+# Pass sim_id to re-index just that simulation; otherwise the search index is rebuilt.
+@router.post("/cache/invalidate/")
+async def invalidate_catalog_cache(sim_id: int = None):
+    invalidate_catalog()
+    try:
+        if sim_id is not None:
+            await refresh_simulation(sim_id)
+        else:
+            await build_search_index()
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"invalidated": True}
+
+
+# How many concurrent identical reads were merged into one upstream call
+@router.get("/singleflight/")
+async def singleflight_stats():
+    return read_coalescer.stats()
+
+# Pending analytics rows, how far the write-behind buffer lags behind and rows it dead-lettered
+@router.get("/write-behind/")
+async def write_behind_stats():
+    return analytics_buffer.stats()
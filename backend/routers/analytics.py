@@ -1,14 +1,22 @@
-from fastapi import APIRouter, HTTPException
-from utils.supabase_client import supabase
+from fastapi import APIRouter, HTTPException, Response
+from utils.supabase_client import get_async_supabase
+from utils.write_behind import ANALYTICS_WRITE_BEHIND, analytics_buffer
+from utils.singleflight import read_coalescer
 
 router = APIRouter()
 
 # for now, feedback is just one string which includes both +/- feedback
 
 @router.post("/submit/")
-def submit_feedback(session_id: int, feedback: str):
+async def submit_feedback(session_id: int, feedback: str, http_response: Response):
+    if ANALYTICS_WRITE_BEHIND:
+        # Acknowledge now; the row is inserted with the next bulk flush
+        analytics_buffer.submit({"session_id": session_id, "feedback": feedback})
+        http_response.status_code = 202
+        return {"queued": True}
     try:
-        response = (
+        supabase = await get_async_supabase()
+        response = await (
             supabase.table("analytics")
             .insert({
                 "session_id": session_id,
@@ -23,15 +31,16 @@ def submit_feedback(session_id: int, feedback: str):
         raise HTTPException(status_code=400, detail=str(e))
     
 @router.get("/{sim_id}")
-def view_session_feedback(session_id : int):
+async def view_session_feedback(session_id : int):
     try:
-        response = (
+        supabase = await get_async_supabase()
+        response = await read_coalescer.do(("session-feedback", session_id), (
             supabase.table("sessions")
             .select("*")
             .eq("session_id", session_id)  
             .single()
-            .execute()
-        )
+            .execute
+        ))
         if not response.data:
             return []
         return response.data
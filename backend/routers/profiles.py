@@ -1,5 +1,7 @@
-from fastapi import APIRouter, HTTPException
-from utils.supabase_client import supabase
+from fastapi import APIRouter, HTTPException, Request
+from utils.supabase_client import get_async_supabase
+from utils.bulk import bulk_insert
+from utils.singleflight import read_coalescer
 from pydantic import BaseModel
 from typing import List
 
@@ -16,21 +18,26 @@ class ProfileCreate(BaseModel):
     goals: List[str]
     studyLevel: str
 
+
+def profile_row(profile: ProfileCreate) -> dict:
+    return {
+        "user_id": profile.user_id,
+        "role": profile.role,
+        "field": profile.field,
+        "studyLevel": profile.studyLevel,
+        "interests": profile.interests,
+        "experience": profile.experience,
+        "focusAreas": profile.focusAreas,
+        "goals": profile.goals,
+    }
+
 @router.post("/create-user/")
-def add_user_profile(profile: ProfileCreate):
+async def add_user_profile(profile: ProfileCreate):
     try:
-        response = (
+        supabase = await get_async_supabase()
+        response = await (
             supabase.table("profiles")
-            .insert({
-                "user_id": profile.user_id,
-                "role": profile.role,
-                "field": profile.field,
-                "studyLevel": profile.studyLevel,
-                "interests": profile.interests,
-                "experience": profile.experience,
-                "focusAreas": profile.focusAreas,
-                "goals": profile.goals,
-            })
+            .insert(profile_row(profile))
             .execute()
         )
         if not response.data:
@@ -38,11 +45,18 @@ def add_user_profile(profile: ProfileCreate):
         return response.data
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
+
+# Onboard many users at once: a JSON array or NDJSON stream of ProfileCreate objects.
+# Returns one result per input row (created / invalid / failed), in input order.
+@router.post("/bulk/")
+async def add_user_profiles_in_bulk(request: Request):
+    return await bulk_insert(request, "profiles", ProfileCreate, profile_row)
     
 @router.put("/update/{user_id}")
-def update_user_profile(profile : ProfileCreate):
+async def update_user_profile(profile : ProfileCreate):
     try:
-        response = (
+        supabase = await get_async_supabase()
+        response = await (
             supabase.table("profiles")
             .update({
                 "role": profile.role,
@@ -63,9 +77,10 @@ def update_user_profile(profile : ProfileCreate):
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.delete("/delete/{user_id}")
-def delete_user_profile(user_id):
+async def delete_user_profile(user_id):
     try:
-        response = (
+        supabase = await get_async_supabase()
+        response = await (
             supabase.table("profiles")
             .delete()
             .eq("user_id", user_id)
@@ -76,15 +91,16 @@ def delete_user_profile(user_id):
         raise HTTPException(status_code=400, detail=str(e))
     
 @router.get("/{user_id}")
-def get_user_profile(user_id : str):
+async def get_user_profile(user_id : str):
     try:
-        response = (
+        supabase = await get_async_supabase()
+        response = await read_coalescer.do(("profile", user_id), (
             supabase.table("profiles")
             .select("*")
             .eq("user_id", user_id)
             .single()
-            .execute()
-        )
+            .execute
+        ))
         if not response.data:
             return {}
         return response.data
@@ -1,18 +1,12 @@
-from fastapi import APIRouter, HTTPException, Query
-from utils.supabase_client import supabase
+from fastapi import APIRouter, HTTPException, Query, Depends, Response, Request
+from utils.supabase_client import get_async_supabase
+from utils.pagination import PageParams, fetch_page
+from utils.bulk import bulk_insert
+from utils.export import export_sessions
+from fastapi.responses import StreamingResponse
 from typing import List, Literal
 from uuid import UUID
 from pydantic import BaseModel
-import sys
-import os
-sys.path.append(os.path.join(
-    os.path.dirname(os.path.__file__),
-    "..", # router
-    "..", # backend
-    "..", # root
-    "Scoring"
-))
-# from MockModel import MockModel
 
 router = APIRouter()
 
@@ -24,6 +18,16 @@ class SessionCreate(BaseModel):
     participants: List[int]
     associated_simulation: int
 
+
+def session_row(session: SessionCreate) -> dict:
+    return {
+        "name": session.name,
+        "actual_duration": session.actual_duration,
+        "completion_status": session.completion_status,
+        "participants": session.participants,
+        "associated_simulation": session.associated_simulation
+    }
+
 # Create individual session
 
 # Host session
@@ -32,17 +36,12 @@ class SessionCreate(BaseModel):
 
 # Add session to database
 @router.post("/create-session/")
-def add_session_to_database(session: SessionCreate): 
+async def add_session_to_database(session: SessionCreate): 
     try:
-        response = (
+        supabase = await get_async_supabase()
+        response = await (
             supabase.table("sessions")
-            .insert({
-                "name": session.name,
-                "actual_duration": session.actual_duration,
-                "completion_status": session.completion_status,
-                "participants": session.participants,
-                "associated_simulation": session.associated_simulation
-            })
+            .insert(session_row(session))
             .execute()
         )
         if not response.data:
@@ -51,23 +50,38 @@ def add_session_to_database(session: SessionCreate):
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+# Add many sessions at once: a JSON array or NDJSON stream of SessionCreate objects.
+# Returns one result per input row (created / invalid / failed), in input order.
+@router.post("/bulk/")
+async def add_sessions_in_bulk(request: Request):
+    return await bulk_insert(request, "sessions", SessionCreate, session_row)
+
 # Fetch all session history
 @router.get("/all/history/")
-def get_all_previous_sessions():
-    response = (
-        supabase.table("sessions")
-        .select("*")
-        .execute()
+async def get_all_previous_sessions(response: Response, page: PageParams = Depends()):
+    supabase = await get_async_supabase()
+    return await fetch_page(supabase.table("sessions"), "session_id", page, response)
+
+# Export every session as NDJSON or CSV, streamed page by page.
+# include_feedback adds the analytics feedback of each session.
+@router.get("/export/")
+async def export_session_history(
+    format: Literal["ndjson", "csv"] = Query("ndjson"),
+    include_feedback: bool = Query(False),
+):
+    media_type = "application/x-ndjson" if format == "ndjson" else "text/csv"
+    return StreamingResponse(
+        export_sessions(format, include_feedback),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="sessions.{format}"'},
     )
-    if not response.data:
-        return []
-    return response.data
 
 # Session details 
 @router.get("/{sim_id}")
-def get_simulation(session_id : int):
+async def get_simulation(session_id : int):
     try:
-        response = (
+        supabase = await get_async_supabase()
+        response = await (
             supabase.table("sessions")
             .select("*")
             .eq("session_id", session_id)  
@@ -82,57 +96,46 @@ def get_simulation(session_id : int):
     
 # Filter sessions by category (one category per session, stored as text)
 @router.get("/category/")
-def filter_sessions_by_category(categories: list[str] = Query(...)):
+async def filter_sessions_by_category(response: Response, categories: list[str] = Query(...), page: PageParams = Depends()):
     try:
+        supabase = await get_async_supabase()
         # Get sessions where the 'categories' text column matches any of the provided categories
-        sessions_resp = (
-            supabase.table("sessions")
-            .select("*")
-            .in_("categories", categories)
-            .execute()
+        return await fetch_page(
+            supabase.table("sessions"), "session_id", page, response,
+            where=lambda query: query.in_("categories", categories),
         )
-        return sessions_resp.data or []
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
     
 # AI feedback
 from fastapi import UploadFile, File, Form
-import tempfile
-
-class FeedbackRequest(BaseModel):
-    session_id: int
-
-# @router.put("/generate-feedback/")
-# async def generate_feedback(
-#     session_id: int = Form(...),
-#     video: UploadFile = File(...)
-# ):
-#     """
-#     Accepts a video file and session_id, processes the video, generates feedback, and stores it in the database.
-#     """
-#     try:
-#         # Save uploaded video to a temporary file
-#         with tempfile.NamedTemporaryFile(delete=False, suffix=".mp4") as tmp:
-#             contents = await video.read()
-#             tmp.write(contents)
-#             tmp_path = tmp.name
-
-#         # TODO: Extract features/embeddings from video (placeholder)
-#         # For now, use dummy embedding
-#         embedding = ['dummy embedding']
-
-#         # Generate feedback using the model
-#         model = MockModel()
-#         feedback = model.predict(embedding)
-
-#         # Store feedback in the database (sessions table, add 'feedback' column if not present)
-#         update_resp = (
-#             supabase.table("sessions")
-#             .update({"feedback": feedback})
-#             .eq("session_id", session_id)
-#             .execute()
-#         )
-
-#         return {"session_id": session_id, "feedback": feedback, "db_response": update_resp.data}
-#     except Exception as e:
-#         raise HTTPException(status_code=400, detail=str(e))
\ No newline at end of file
+from fastapi.concurrency import run_in_threadpool
+from utils.jobs import feedback_jobs, save_upload
+import os
+
+
+# Queue feedback generation for a session video; poll /feedback-jobs/{job_id} for the result
+@router.put("/generate-feedback/", status_code=202)
+async def generate_feedback(
+    session_id: int = Form(...),
+    video: UploadFile = File(...)
+):
+    if await feedback_jobs.full():
+        raise HTTPException(status_code=503, detail="Feedback queue is full, try again later")
+    try:
+        suffix = os.path.splitext(video.filename or "")[1] or ".mp4"
+        upload_path = await run_in_threadpool(save_upload, video.file, suffix)
+        job_id = await feedback_jobs.submit(session_id, upload_path)
+        return {"job_id": job_id, "session_id": session_id, "status": "queued"}
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+# Get the status of a feedback job
+@router.get("/feedback-jobs/{job_id}")
+async def get_feedback_job(job_id: str):
+    job = await feedback_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Feedback job not found")
+    job.pop("upload_path", None)
+    return job
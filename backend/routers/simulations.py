@@ -1,5 +1,9 @@
-from fastapi import APIRouter, HTTPException, Depends, Query
-from utils.supabase_client import supabase
+from fastapi import APIRouter, HTTPException, Depends, Query, Response
+from utils.supabase_client import get_async_supabase
+from utils.singleflight import read_coalescer
+from utils.pagination import PageParams, fetch_page
+from utils.cache import MISSING, catalog_cache
+from utils.search_index import simulation_index
 
 
 
@@ -7,42 +11,49 @@ router = APIRouter()
 
 # View all simulations
 @router.get("/")
-def list_simulations():
-    response = (
-        supabase.table("simulations")
-        .select("*")
-        .execute()
+async def list_simulations(response: Response, page: PageParams = Depends()):
+    supabase = await get_async_supabase()
+    return await fetch_page(
+        supabase.table("simulations"), "sim_id", page, response,
+        cache=catalog_cache, cache_key=("simulations",),
     )
-    if not response.data:
-        return []
-    return response.data
 
 # View simulation details
 @router.get("/{sim_id}")
-def get_simulation(sim_id : int):
+async def get_simulation(sim_id : int):
+    cached = catalog_cache.get(("simulation", sim_id))
+    if cached is not MISSING:
+        return cached
     try:
-        response = (
+        supabase = await get_async_supabase()
+        response = await read_coalescer.do(("simulation", sim_id), (
             supabase.table("simulations")
             .select("*")
             .eq("sim_id", sim_id)  
             .single()
-            .execute()
-        )
+            .execute
+        ))
         if not response.data:
             return []
+        catalog_cache.set(("simulation", sim_id), response.data)
         return response.data
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
     
 # Search simulations
-# For now only works if the search text is like a substring of the description
+# Ranked (BM25) search over descriptions, served from the in-memory index. Until the
+# index has been built, falls back to a substring match in the database.
 @router.get("/search/")
-def search_simulation_description(search_text: str = Query(...)):
+async def search_simulation_description(search_text: str = Query(...), top_k: int = Query(10, ge=1, le=100)):
+    if simulation_index.ready:
+        return [{**row, "score": score} for row, score in simulation_index.search(search_text, top_k)]
     try:
-        response = (
+        supabase = await get_async_supabase()
+        response = await (
             supabase.table("simulations")
             .select("*")
             .ilike("description", f"%{search_text}%")
+            .limit(top_k)
             .execute()
         )
         if not response.data:
@@ -53,15 +64,14 @@ def search_simulation_description(search_text: str = Query(...)):
 
 # Filter simulations by category 
 @router.get("/category/")
-def filter_sessions_by_category(categories: list[str] = Query(...)):
+async def filter_sessions_by_category(response: Response, categories: list[str] = Query(...), page: PageParams = Depends()):
     try:
+        supabase = await get_async_supabase()
         # Get sessions where the 'categories' text column matches any of the provided categories
-        sessions_resp = (
-            supabase.table("simulations")
-            .select("*")
-            .in_("category", categories)
-            .execute()
+        return await fetch_page(
+            supabase.table("simulations"), "sim_id", page, response,
+            where=lambda query: query.in_("category", categories),
+            cache=catalog_cache, cache_key=("simulations-category", tuple(sorted(categories))),
         )
-        return sessions_resp.data or []
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
\ No newline at end of file
@@ -0,0 +1,106 @@
+import json
+from typing import AsyncIterator, Callable, Type
+from fastapi import HTTPException, Request
+from pydantic import BaseModel, ValidationError
+from utils.supabase_client import get_async_supabase
+from utils.write_behind import is_rejected
+
+# Rows per multi-row INSERT statement
+BULK_CHUNK_SIZE = 500
+NDJSON_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+
+
+async def iter_records(request: Request) -> AsyncIterator[tuple]:
+    """
+    Yield `(record, error)` pairs from a JSON array body or a streamed NDJSON body.
+
+    NDJSON is parsed line by line as it arrives, so large uploads are never held
+    in memory as a whole.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    if content_type not in NDJSON_TYPES:
+        try:
+            body = await request.json()
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid JSON: {e}")
+        if not isinstance(body, list):
+            raise HTTPException(status_code=400, detail="Expected a JSON array")
+        for record in body:
+            yield record, None
+        return
+
+    buffer = b""
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield _parse_line(line)
+    if buffer.strip():
+        yield _parse_line(buffer)
+
+
+def _parse_line(line: bytes) -> tuple:
+    try:
+        return json.loads(line), None
+    except ValueError as e:
+        return None, f"Invalid JSON: {e}"
+
+
+async def bulk_insert(request: Request, table: str, model: Type[BaseModel], to_row: Callable[[BaseModel], dict]) -> dict:
+    """
+    Validate every record against `model` and insert the valid ones into `table` in
+    chunks of BULK_CHUNK_SIZE rows. Returns a summary plus one result per input row,
+    in input order.
+    """
+    supabase = await get_async_supabase()
+    results = []
+    chunk = []  # (result index, row)
+
+    async def insert_rows(rows: list):
+        try:
+            response = await supabase.table(table).insert([row for _, row in rows]).execute()
+        except Exception as e:
+            # A multi-row INSERT is atomic: when the database rejects a row, split the
+            # rows until the offending ones are alone, so the valid rows still go in
+            if is_rejected(e) and len(rows) > 1:
+                middle = len(rows) // 2
+                await insert_rows(rows[:middle])
+                await insert_rows(rows[middle:])
+                return
+            for index, _ in rows:
+                results[index] = {"index": index, "status": "failed", "error": str(e)}
+            return
+        inserted = response.data or []
+        for position, (index, _) in enumerate(rows):
+            results[index] = {
+                "index": index,
+                "status": "created",
+                "data": inserted[position] if position < len(inserted) else None,
+            }
+
+    async def insert_chunk():
+        await insert_rows(list(chunk))
+        chunk.clear()
+
+    async for record, error in iter_records(request):
+        index = len(results)
+        if error is None:
+            try:
+                row = to_row(model.model_validate(record))
+            except ValidationError as e:
+                error = e.errors(include_url=False, include_context=False)
+        if error is not None:
+            results.append({"index": index, "status": "invalid", "error": error})
+            continue
+        results.append(None)
+        chunk.append((index, row))
+        if len(chunk) >= BULK_CHUNK_SIZE:
+            await insert_chunk()
+    if chunk:
+        await insert_chunk()
+
+    summary = {"created": 0, "invalid": 0, "failed": 0}
+    for result in results:
+        summary[result["status"]] += 1
+    return {**summary, "results": results}
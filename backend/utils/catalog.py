@@ -0,0 +1,80 @@
+import os
+from utils.cache import catalog_cache
+from utils.pagination import iter_pages
+from utils.search_index import simulation_index
+from utils.supabase_client import get_async_supabase
+
+# Set CATALOG_REALTIME=1 to drop cached catalog reads as soon as Postgres reports a change
+# (requires Realtime to be enabled for the simulations table in Supabase).
+CATALOG_REALTIME = os.getenv("CATALOG_REALTIME", "0") == "1"
+
+CATALOG_PAGE_SIZE = 500
+
+_channel = None
+
+
+async def load_catalog():
+    """Read every simulation, paging by sim_id."""
+    rows = []
+    async for page in iter_pages("simulations", "sim_id", page_size=CATALOG_PAGE_SIZE):
+        rows.extend(page)
+    return rows
+
+
+async def build_search_index():
+    """(Re)build the description search index from the whole catalog."""
+    rows = await load_catalog()
+    simulation_index.build((row["sim_id"], row.get("description"), row) for row in rows)
+    print(f"Search index built over {len(rows)} simulations")
+
+
+async def refresh_simulation(sim_id: int):
+    """Re-read one simulation and update the search index in place."""
+    supabase = await get_async_supabase()
+    rows = (await supabase.table("simulations").select("*").eq("sim_id", sim_id).execute()).data
+    if rows:
+        simulation_index.add(sim_id, rows[0].get("description"), rows[0])
+    else:
+        simulation_index.remove(sim_id)
+
+
+def invalidate_catalog():
+    """Drop every cached catalog read so the next request goes to Supabase."""
+    catalog_cache.clear()
+
+
+def _on_catalog_change(payload):
+    invalidate_catalog()
+    data = payload.get("data", {})
+    record = data.get("record")
+    if data.get("type") == "DELETE" or not record:
+        old = data.get("old_record") or {}
+        if "sim_id" in old:
+            simulation_index.remove(old["sim_id"])
+    else:
+        simulation_index.add(record["sim_id"], record.get("description"), record)
+
+
+async def start_catalog_listener():
+    """Subscribe to simulations table changes and apply each one to the cache and search index."""
+    global _channel
+    if not CATALOG_REALTIME or _channel is not None:
+        return
+    supabase = await get_async_supabase()
+    try:
+        _channel = await (
+            supabase.channel("simulations-catalog")
+            .on_postgres_changes("*", callback=_on_catalog_change, schema="public", table="simulations")
+            .subscribe()
+        )
+    except Exception as e:
+        print(f"Catalog realtime listener not started: {e}")
+
+
+async def stop_catalog_listener():
+    global _channel
+    if _channel is None:
+        return
+    supabase = await get_async_supabase()
+    await supabase.remove_channel(_channel)
+    _channel = None
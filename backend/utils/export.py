@@ -0,0 +1,66 @@
+import csv
+import io
+import json
+from collections import defaultdict
+from typing import AsyncIterator
+from utils.pagination import iter_pages
+from utils.supabase_client import get_async_supabase
+
+EXPORT_PAGE_SIZE = 500
+
+
+async def _attach_feedback(rows: list):
+    """
+    Add the analytics feedback for each session in the page as `analytics_feedback`.
+
+    Feedback is read EXPORT_PAGE_SIZE rows at a time with range(), so PostgREST's
+    max-rows cap cannot silently drop feedback when sessions have many rows each.
+    """
+    supabase = await get_async_supabase()
+    ids = [row["session_id"] for row in rows]
+    by_session = defaultdict(list)
+    start = 0
+    while True:
+        feedback = (
+            await supabase.table("analytics")
+            .select("session_id,feedback")
+            .in_("session_id", ids)
+            .order("session_id")
+            .range(start, start + EXPORT_PAGE_SIZE - 1)
+            .execute()
+        ).data or []
+        for item in feedback:
+            by_session[item["session_id"]].append(item["feedback"])
+        if len(feedback) < EXPORT_PAGE_SIZE:
+            break
+        start += EXPORT_PAGE_SIZE
+    for row in rows:
+        row["analytics_feedback"] = by_session.get(row["session_id"], [])
+
+
+async def export_sessions(fmt: str, include_feedback: bool) -> AsyncIterator[str]:
+    """
+    Stream the sessions table as NDJSON or CSV, one page at a time, so memory use
+    does not depend on table size.
+    """
+    fieldnames = None
+    async for rows in iter_pages("sessions", "session_id", page_size=EXPORT_PAGE_SIZE):
+        if include_feedback:
+            await _attach_feedback(rows)
+        if fmt == "ndjson":
+            yield "".join(json.dumps(row, default=str) + "\n" for row in rows)
+            continue
+        out = io.StringIO()
+        if fieldnames is None:
+            # Columns come from the first page; later pages are written against them
+            fieldnames = list(rows[0].keys())
+            writer = csv.DictWriter(out, fieldnames=fieldnames, extrasaction="ignore")
+            writer.writeheader()
+        else:
+            writer = csv.DictWriter(out, fieldnames=fieldnames, extrasaction="ignore")
+        for row in rows:
+            writer.writerow({
+                k: json.dumps(v) if isinstance(v, (list, dict)) else v
+                for k, v in row.items()
+            })
+        yield out.getvalue()
@@ -0,0 +1,256 @@
+import asyncio
+import json
+import shutil
+import multiprocessing
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+from utils.scoring import load_scoring
+from utils.supabase_client import get_async_supabase
+
+JOBS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".jobs"))
+
+# Job states, in order; a job ends as completed, failed or unavailable
+QUEUED, RUNNING, COMPLETED, FAILED, UNAVAILABLE = "queued", "running", "completed", "failed", "unavailable"
+
+
+class ScoringUnavailable(Exception):
+    """No genuine score can be produced for the upload; the job must not write feedback."""
+
+
+class JobStore:
+    """
+    Feedback jobs in a local SQLite file. Worker processes write their progress
+    here directly, so it is the single source of truth for job status.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS feedback_jobs (
+                    id TEXT PRIMARY KEY,
+                    session_id INTEGER NOT NULL,
+                    status TEXT NOT NULL,
+                    progress REAL NOT NULL DEFAULT 0,
+                    stage TEXT,
+                    upload_path TEXT,
+                    result TEXT,
+                    error TEXT,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            """)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=10)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def create(self, session_id: int, upload_path: str) -> str:
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO feedback_jobs (id, session_id, status, stage, upload_path, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (job_id, session_id, QUEUED, "queued", upload_path, now, now),
+            )
+        return job_id
+
+    def update(self, job_id: str, **fields):
+        fields["updated_at"] = time.time()
+        if "result" in fields:
+            fields["result"] = json.dumps(fields["result"])
+        columns = ", ".join(f"{name} = ?" for name in fields)
+        with self._connect() as conn:
+            conn.execute(f"UPDATE feedback_jobs SET {columns} WHERE id = ?", (*fields.values(), job_id))
+
+    def get(self, job_id: str) -> Optional[dict]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM feedback_jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def unfinished(self) -> list:
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT * FROM feedback_jobs WHERE status IN (?, ?) ORDER BY created_at", (QUEUED, RUNNING),
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def count_unfinished(self) -> int:
+        with self._connect() as conn:
+            return conn.execute(
+                "SELECT COUNT(*) FROM feedback_jobs WHERE status IN (?, ?)", (QUEUED, RUNNING),
+            ).fetchone()[0]
+
+
+def _discard(path: str):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def _warm_worker():
+    """Import the scoring stack once per worker process, not on its first job."""
+    load_scoring("ModelRegistry")
+    load_scoring("videos.Summarizer")
+
+
+def run_scoring_job(db_path: str, job_id: str, upload_path: str):
+    """
+    Score one uploaded session video. Runs in a worker process.
+
+    The video is embedded by TwelveLabs, as the training videos were
+    (Scoring/embedding), and scored with the registry's active model.
+    """
+    store = JobStore(db_path)
+    store.update(job_id, status=RUNNING, stage="embedding", progress=0.1)
+    registry = load_scoring("ModelRegistry").ModelRegistry()
+    if registry.active_version() is None:
+        raise ScoringUnavailable("no scoring model has been trained (Scoring/train.py)")
+    summarizer = load_scoring("videos.Summarizer").Summarizer()  # loads Scoring's .env
+    if not os.getenv("TWELVE_LABS_API_KEY"):
+        raise ScoringUnavailable("TWELVE_LABS_API_KEY is not set")
+    embedding = summarizer.embed_file(upload_path)
+
+    store.update(job_id, stage="scoring", progress=0.7)
+    import numpy as np  # comes with the scoring stack, not the API
+    _, model = registry.load()
+    feedback = model.predict(np.atleast_2d(np.asarray(embedding, dtype=np.float32))).tolist()
+    _discard(upload_path)
+    return feedback
+
+
+class FeedbackJobQueue:
+    """
+    Runs feedback jobs on a bounded pool of worker processes, so scoring never
+    blocks the API event loop. Results are written back to `sessions.feedback`.
+
+    The job database is created on first use, and every call into it runs on a
+    thread, since worker processes write to the same file and SQLite may wait on
+    their locks.
+    """
+
+    def __init__(self, db_path: str, workers: int = 2, max_pending: int = 100):
+        self.db_path = db_path
+        self.workers = workers
+        self.max_pending = max_pending
+        self._store = None
+        self._store_lock = threading.Lock()
+        self._pool = None
+        self._tasks = set()
+
+    @property
+    def store(self) -> JobStore:
+        with self._store_lock:
+            if self._store is None:
+                self._store = JobStore(self.db_path)
+            return self._store
+
+    def _executor(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_warm_worker,
+            )
+        return self._pool
+
+    async def _call(self, method: str, *args, **kwargs):
+        return await asyncio.to_thread(lambda: getattr(self.store, method)(*args, **kwargs))
+
+    async def full(self) -> bool:
+        return await self._call("count_unfinished") >= self.max_pending
+
+    async def get(self, job_id: str) -> Optional[dict]:
+        return await self._call("get", job_id)
+
+    async def submit(self, session_id: int, upload_path: str) -> str:
+        job_id = await self._call("create", session_id, upload_path)
+        self._schedule(job_id, session_id, upload_path)
+        return job_id
+
+    def _schedule(self, job_id: str, session_id: int, upload_path: str):
+        task = asyncio.create_task(self._run(job_id, session_id, upload_path))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, job_id: str, session_id: int, upload_path: str):
+        loop = asyncio.get_running_loop()
+        try:
+            feedback = await loop.run_in_executor(
+                self._executor(), run_scoring_job, self.db_path, job_id, upload_path,
+            )
+        except ScoringUnavailable as e:
+            await self._call("update", job_id, status=UNAVAILABLE, stage="done", error=f"Scoring not available: {e}")
+            _discard(upload_path)
+            return
+        except Exception as e:
+            await self._call("update", job_id, status=FAILED, error=f"Scoring failed: {e}")
+            _discard(upload_path)
+            return
+        await self._call("update", job_id, stage="saving", progress=0.9, result=feedback)
+        try:
+            supabase = await get_async_supabase()
+            await (
+                supabase.table("sessions")
+                .update({"feedback": feedback})
+                .eq("session_id", session_id)
+                .execute()
+            )
+        except Exception as e:
+            await self._call("update", job_id, status=FAILED, error=f"Saving feedback failed: {e}")
+            return
+        await self._call("update", job_id, status=COMPLETED, stage="done", progress=1.0)
+
+    async def resume(self):
+        """Requeue jobs a previous process left unfinished, if their upload is still on disk."""
+        if not os.path.exists(self.db_path):
+            return
+        for job in await self._call("unfinished"):
+            if job["upload_path"] and os.path.exists(job["upload_path"]):
+                await self._call("update", job["id"], status=QUEUED, stage="queued", progress=0)
+                self._schedule(job["id"], job["session_id"], job["upload_path"])
+            else:
+                await self._call("update", job["id"], status=FAILED, error="Interrupted and upload no longer available")
+
+    async def shutdown(self):
+        for task in self._tasks:
+            task.cancel()
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+FEEDBACK_JOBS_DB = os.getenv("FEEDBACK_JOBS_DB", os.path.join(JOBS_DIR, "jobs.sqlite3"))
+# Uploads wait next to the job database until their job has run
+UPLOAD_DIR = os.path.join(os.path.dirname(os.path.abspath(FEEDBACK_JOBS_DB)), "uploads")
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+def save_upload(fileobj, suffix: str) -> str:
+    """Copy an upload to UPLOAD_DIR in fixed-size chunks, never holding the whole file in memory."""
+    os.makedirs(UPLOAD_DIR, exist_ok=True)
+    path = os.path.join(UPLOAD_DIR, uuid.uuid4().hex + suffix)
+    with open(path, "wb") as out:
+        shutil.copyfileobj(fileobj, out, UPLOAD_CHUNK_SIZE)
+    return path
+
+# Nothing is created on disk until the first job is submitted
+feedback_jobs = FeedbackJobQueue(
+    FEEDBACK_JOBS_DB,
+    workers=int(os.getenv("FEEDBACK_WORKERS", "2")),
+    max_pending=int(os.getenv("FEEDBACK_MAX_PENDING", "100")),
+)
@@ -0,0 +1,120 @@
+import bisect
+from collections import defaultdict
+from typing import Callable, Dict, List, Tuple
+
+# Prometheus' default latency buckets, in seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Tuple[str, ...], values: Tuple, extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = ()):
+        self.name, self.help, self.labels = name, help, labels
+        self._values: Dict[Tuple, float] = defaultdict(float)
+
+    def inc(self, *labels, amount: float = 1.0):
+        self._values[labels] += amount
+
+    def samples(self) -> List[str]:
+        return [f"{self.name}{_labels(self.labels, key)} {_number(v)}" for key, v in self._values.items()]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, *labels, amount: float = 1.0):
+        self._values[labels] -= amount
+
+    def set(self, *labels, value: float):
+        self._values[labels] = value
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = (), buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name, self.help, self.labels, self.buckets = name, help, labels, buckets
+        # labels -> [per-bucket counts (non-cumulative, last is +Inf), sum, count]
+        self._values: Dict[Tuple, list] = {}
+
+    def observe(self, *labels, value: float):
+        entry = self._values.get(labels)
+        if entry is None:
+            entry = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        entry[0][bisect.bisect_left(self.buckets, value)] += 1
+        entry[1] += value
+        entry[2] += 1
+
+    def samples(self) -> List[str]:
+        lines = []
+        for key, (counts, total, count) in self._values.items():
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                cumulative += n
+                le = "+Inf" if bound == float("inf") else _number(bound)
+                bucket_label = f'le="{le}"'
+                lines.append(f"{self.name}_bucket{_labels(self.labels, key, bucket_label)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labels, key)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labels, key)} {count}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+        self._collectors: List[Callable[[], List[Gauge]]] = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector: Callable[[], List[Gauge]]):
+        """Register a callback that builds gauges from other components' stats at scrape time."""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        metrics = list(self._metrics)
+        for collector in self._collectors:
+            metrics.extend(collector())
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+http_request_duration = registry.register(Histogram(
+    "http_request_duration_seconds", "Time spent handling HTTP requests", ("method", "route"),
+))
+http_requests = registry.register(Counter(
+    "http_requests_total", "HTTP requests by response status", ("method", "route", "status"),
+))
+http_in_flight = registry.register(Gauge(
+    "http_requests_in_flight", "HTTP requests currently being handled", ("method",),
+))
+supabase_request_duration = registry.register(Histogram(
+    "supabase_request_duration_seconds", "Time until Supabase returned response headers", ("table", "operation"),
+))
+supabase_errors = registry.register(Counter(
+    "supabase_request_errors_total", "Supabase calls that failed or returned an error status", ("table", "operation"),
+))
+
@@ -0,0 +1,143 @@
+import re
+from typing import AsyncIterator, Callable, List, Optional
+from fastapi import HTTPException, Query, Response
+from utils.cache import MISSING, TTLCache
+from utils.supabase_client import get_async_supabase
+
+MAX_LIMIT = 500
+
+# Header carrying the cursor for the next page; absent on the last page
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+_COLUMN_RE = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+class PageParams:
+    """
+    Query parameters shared by every list-style route (use with `Depends()`).
+
+    Without `limit` a route returns every matching row, as it did before
+    pagination; the rows are still read from the database in keyset pages.
+    """
+
+    def __init__(
+        self,
+        limit: Optional[int] = Query(None, ge=1, le=MAX_LIMIT, description="Rows per page; omit to return every row"),
+        after: Optional[str] = Query(None, description="Return rows whose key is greater than this cursor "
+                                     "(the X-Next-Cursor of the previous page; compared in the key column's type)"),
+        fields: Optional[List[str]] = Query(None, description="Columns to return, e.g. fields=name&fields=category or fields=name,category"),
+        count_only: bool = Query(False, description="Only return the number of matching rows"),
+    ):
+        self.limit = limit
+        self.after = after
+        self.fields = fields
+        self.count_only = count_only
+
+
+def select_columns(fields: Optional[List[str]], key: str) -> str:
+    """Build the PostgREST select list for a projection, always keeping the cursor key."""
+    if not fields:
+        return "*"
+    columns = []
+    for field in fields:
+        for column in field.split(","):
+            column = column.strip()
+            if not column:
+                continue
+            if not _COLUMN_RE.match(column):
+                raise HTTPException(status_code=400, detail=f"Invalid field: {column}")
+            if column not in columns:
+                columns.append(column)
+    if key not in columns:
+        columns.insert(0, key)
+    return ",".join(columns)
+
+
+async def fetch_page(
+    table,
+    key: str,
+    page: PageParams,
+    response: Response,
+    where: Callable = None,
+    cache: TTLCache = None,
+    cache_key: tuple = (),
+):
+    """
+    Fetch one keyset-paginated page from `table`, ordered by `key`.
+
+    `where` applies the route's own filters to the query builder. Returns the rows
+    (a list, same shape as before pagination) and sets `X-Next-Cursor` when more rows
+    exist. In count-only mode returns `{"count": n}` without fetching any rows.
+
+    With `cache`, pages are cached under `cache_key` plus the page parameters;
+    `cache_key` must identify the route and its filters.
+    """
+    if cache is None:
+        body, cursor = await _query_page(table, key, page, where)
+    else:
+        full_key = cache_key + (page.limit, page.after, tuple(page.fields or ()), page.count_only)
+        cached = cache.get(full_key)
+        if cached is MISSING:
+            cached = await _query_page(table, key, page, where)
+            cache.set(full_key, cached)
+        body, cursor = cached
+    if cursor is not None:
+        response.headers[NEXT_CURSOR_HEADER] = cursor
+    return body
+
+
+async def _query_page(table, key: str, page: PageParams, where: Callable):
+    if page.count_only:
+        query = table.select(key, count="exact", head=True)
+        if where:
+            query = where(query)
+        result = await query.execute()
+        return {"count": result.count or 0}, None
+
+    if page.limit is None:
+        return await _query_all(table, key, page, where), None
+
+    query = table.select(select_columns(page.fields, key))
+    if where:
+        query = where(query)
+    if page.after is not None:
+        query = query.gt(key, page.after)
+    # Ask for one extra row to know whether another page follows
+    result = await query.order(key).limit(page.limit + 1).execute()
+    rows = result.data or []
+    if len(rows) > page.limit:
+        rows = rows[:page.limit]
+        return rows, str(rows[-1][key])
+    return rows, None
+
+
+async def _query_all(table, key: str, page: PageParams, where: Callable) -> list:
+    """Every matching row, read MAX_LIMIT at a time so PostgREST's max-rows cap never truncates it."""
+    rows, after = [], page.after
+    while True:
+        query = table.select(select_columns(page.fields, key))
+        if where:
+            query = where(query)
+        if after is not None:
+            query = query.gt(key, after)
+        batch = (await query.order(key).limit(MAX_LIMIT).execute()).data or []
+        rows.extend(batch)
+        if len(batch) < MAX_LIMIT:
+            return rows
+        after = batch[-1][key]
+
+
+async def iter_pages(table: str, key: str, columns: str = "*", page_size: int = MAX_LIMIT) -> AsyncIterator[list]:
+    """Walk a whole table in keyset order, yielding one page of rows at a time."""
+    supabase = await get_async_supabase()
+    after = None
+    while True:
+        query = supabase.table(table).select(columns)
+        if after is not None:
+            query = query.gt(key, after)
+        rows = (await query.order(key).limit(page_size).execute()).data or []
+        if rows:
+            yield rows
+        if len(rows) < page_size:
+            return
+        after = rows[-1][key]
@@ -0,0 +1,22 @@
+import importlib
+import os
+import sys
+import threading
+
+SCORING_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "Scoring"))
+
+_lock = threading.Lock()
+
+
+def load_scoring(module: str):
+    """
+    Import a module from the Scoring package on first use, e.g.
+    `load_scoring("ModelRegistry").ModelRegistry`.
+
+    Scoring pulls in sklearn, numpy and pandas, so it is kept out of the API's
+    import path until something actually needs it.
+    """
+    with _lock:
+        if SCORING_DIR not in sys.path:
+            sys.path.append(SCORING_DIR)
+    return importlib.import_module(module)
@@ -0,0 +1,137 @@
+import bisect
+import heapq
+import math
+import re
+from collections import Counter, defaultdict
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Tuple
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Query terms shorter than this are not expanded by prefix or trigram
+MIN_EXPAND_LENGTH = 3
+# Weight of a term reached by prefix expansion relative to an exact match
+PREFIX_WEIGHT = 0.8
+# Minimum trigram Jaccard similarity for a fuzzy match
+FUZZY_THRESHOLD = 0.4
+MAX_EXPANSIONS = 20
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    return _TOKEN_RE.findall(text.lower()) if text else []
+
+
+def trigrams(term: str) -> set:
+    padded = f"  {term} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class SearchIndex:
+    """
+    In-memory inverted index with BM25 ranking.
+
+    Query terms that are not in the vocabulary are expanded to vocabulary terms
+    sharing the prefix ("interv" -> "interview", "intervention") and, failing that,
+    to terms with similar trigrams ("interveiw" -> "interview"). Documents can be
+    added and removed one at a time, so catalog edits do not require a rebuild.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.ready = False
+        self._reset()
+
+    def _reset(self):
+        self._docs: Dict[Hashable, Any] = {}
+        self._doc_len: Dict[Hashable, int] = {}
+        self._doc_terms: Dict[Hashable, List[str]] = {}
+        self._total_len = 0
+        self._postings: Dict[str, Dict[Hashable, int]] = defaultdict(dict)
+        self._vocab: List[str] = []  # sorted, for prefix lookups
+        self._trigrams: Dict[str, set] = defaultdict(set)
+
+    def __len__(self):
+        return len(self._docs)
+
+    def build(self, docs: Iterable[Tuple[Hashable, str, Any]]):
+        """Replace the index contents with `(doc_id, text, payload)` triples."""
+        self._reset()
+        for doc_id, text, payload in docs:
+            self.add(doc_id, text, payload)
+        self.ready = True
+
+    def add(self, doc_id: Hashable, text: Optional[str], payload: Any = None):
+        if doc_id in self._docs:
+            self.remove(doc_id)
+        tokens = tokenize(text)
+        self._docs[doc_id] = payload
+        self._doc_len[doc_id] = len(tokens)
+        self._total_len += len(tokens)
+        counts = Counter(tokens)
+        self._doc_terms[doc_id] = list(counts)
+        for term, tf in counts.items():
+            if term not in self._postings:
+                bisect.insort(self._vocab, term)
+                for gram in trigrams(term):
+                    self._trigrams[gram].add(term)
+            self._postings[term][doc_id] = tf
+
+    def remove(self, doc_id: Hashable):
+        if doc_id not in self._docs:
+            return
+        del self._docs[doc_id]
+        self._total_len -= self._doc_len.pop(doc_id)
+        for term in self._doc_terms.pop(doc_id):
+            postings = self._postings[term]
+            del postings[doc_id]
+            if not postings:
+                del self._postings[term]
+                del self._vocab[bisect.bisect_left(self._vocab, term)]
+                for gram in trigrams(term):
+                    self._trigrams[gram].discard(term)
+                    if not self._trigrams[gram]:
+                        del self._trigrams[gram]
+
+    def _expand(self, term: str) -> List[Tuple[str, float]]:
+        """Vocabulary terms matched by a query term, with their weights."""
+        if term in self._postings:
+            return [(term, 1.0)]
+        if len(term) < MIN_EXPAND_LENGTH:
+            return []
+        start = bisect.bisect_left(self._vocab, term)
+        matches = []
+        for candidate in self._vocab[start:start + MAX_EXPANSIONS]:
+            if not candidate.startswith(term):
+                break
+            matches.append((candidate, PREFIX_WEIGHT))
+        if matches:
+            return matches
+        grams = trigrams(term)
+        shared = Counter(t for gram in grams for t in self._trigrams.get(gram, ()))
+        fuzzy = []
+        for candidate, overlap in shared.items():
+            similarity = overlap / (len(grams) + len(trigrams(candidate)) - overlap)
+            if similarity >= FUZZY_THRESHOLD:
+                fuzzy.append((candidate, similarity))
+        return heapq.nlargest(MAX_EXPANSIONS, fuzzy, key=lambda match: match[1])
+
+    def search(self, query: str, top_k: int = 10) -> List[Tuple[Any, float]]:
+        """Return up to `top_k` `(payload, score)` pairs, best first."""
+        if not self._docs:
+            return []
+        n_docs = len(self._docs)
+        avg_len = self._total_len / n_docs or 1.0
+        scores: Dict[Hashable, float] = defaultdict(float)
+        for term in set(tokenize(query)):
+            for match, weight in self._expand(term):
+                postings = self._postings[match]
+                idf = math.log(1 + (n_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+                for doc_id, tf in postings.items():
+                    norm = self.k1 * (1 - self.b + self.b * self._doc_len[doc_id] / avg_len)
+                    scores[doc_id] += weight * idf * tf * (self.k1 + 1) / (tf + norm)
+        best = heapq.nlargest(top_k, scores.items(), key=lambda item: item[1])
+        return [(self._docs[doc_id], score) for doc_id, score in best]
+
+
+# Simulation catalog, searched by description
+simulation_index = SearchIndex()
@@ -0,0 +1,55 @@
+import asyncio
+from collections import defaultdict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical reads: while a call for `key` is in flight, later
+    callers wait for its result instead of issuing their own upstream request.
+
+    Keys are tuples whose first element names the read (e.g. `("profile", user_id)`);
+    counters are kept per name.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self._calls: Dict[str, int] = defaultdict(int)
+        self._deduplicated: Dict[str, int] = defaultdict(int)
+
+    async def do(self, key: Tuple, fn: Callable[[], Awaitable[Any]]) -> Any:
+        name = key[0]
+        self._calls[name] += 1
+        task = self._inflight.get(key)
+        if task is not None:
+            self._deduplicated[name] += 1
+        else:
+            # The call runs as its own task so one caller disconnecting does not
+            # cancel it for everybody else waiting on it.
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._done(key, t))
+        return await asyncio.shield(task)
+
+    def _done(self, key: Hashable, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()  # mark retrieved even if every waiter went away
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": len(self._inflight),
+            "reads": {
+                name: {
+                    "calls": calls,
+                    "upstream": calls - self._deduplicated[name],
+                    "deduplicated": self._deduplicated[name],
+                }
+                for name, calls in self._calls.items()
+            },
+        }
+
+
+# Shared by the hot single-row reads (simulation, profile, session feedback)
+read_coalescer = SingleFlight()
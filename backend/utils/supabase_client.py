@@ -1,6 +1,16 @@
-from supabase import create_client, Client
+import asyncio
 import os
+import threading
+import time
+from typing import TYPE_CHECKING
+import httpx
 from dotenv import load_dotenv
+from utils.metrics import supabase_request_duration, supabase_errors
+
+# supabase is imported on first use, not at startup: it pulls in the auth, realtime,
+# storage and functions clients, which is most of the API's import time.
+if TYPE_CHECKING:
+    from supabase import AsyncClient, Client
 
 load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), '..', '.env'))
 
@@ -8,7 +18,101 @@ load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), '..', '.env'))
 SUPABASE_URL = os.getenv("NEXT_PUBLIC_SUPABASE_URL")
 SUPABASE_KEY = os.getenv("NEXT_PUBLIC_SUPABASE_ANON_KEY")
 
-print("SUPABASE_URL:", SUPABASE_URL)
-print("SUPABASE_KEY:", SUPABASE_KEY[:6], "...")
+# Connection pool for the async client. Every router shares one httpx client, so
+# requests reuse keep-alive (HTTP/2 where the server offers it) connections instead
+# of opening a new one per call.
+SUPABASE_MAX_CONNECTIONS = int(os.getenv("SUPABASE_MAX_CONNECTIONS", "200"))
+SUPABASE_MAX_KEEPALIVE = int(os.getenv("SUPABASE_MAX_KEEPALIVE", "50"))
+SUPABASE_TIMEOUT = float(os.getenv("SUPABASE_TIMEOUT", "10"))
+
+_supabase: "Client | None" = None
+_sync_lock = threading.Lock()
+
+
+def get_supabase() -> "Client":
+    """Return the shared sync Supabase client, creating it on first use."""
+    global _supabase
+    if _supabase is None:
+        with _sync_lock:
+            if _supabase is None:
+                from supabase import create_client
+                _supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
+    return _supabase
+
+_OPERATIONS = {"GET": "select", "HEAD": "count", "POST": "insert", "PATCH": "update", "DELETE": "delete"}
+
+
+class TimedTransport(httpx.AsyncBaseTransport):
+    """Records the latency of every Supabase call per table (or service) and operation."""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport):
+        self._transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        if "/rest/v1/" in path:
+            table = path.split("/rest/v1/", 1)[1]
+            operation = "rpc" if table.startswith("rpc/") else _OPERATIONS.get(request.method, request.method.lower())
+        else:
+            # auth, storage, functions
+            table, operation = path.strip("/").split("/", 1)[0], request.method.lower()
+        start = time.perf_counter()
+        try:
+            response = await self._transport.handle_async_request(request)
+        except Exception:
+            supabase_errors.inc(table, operation)
+            raise
+        finally:
+            supabase_request_duration.observe(table, operation, value=time.perf_counter() - start)
+        if response.status_code >= 400:
+            supabase_errors.inc(table, operation)
+        return response
+
+    async def aclose(self):
+        await self._transport.aclose()
+
+
+_async_supabase: "AsyncClient | None" = None
+_http_client: httpx.AsyncClient | None = None
+_async_lock = asyncio.Lock()
+
+
+async def get_async_supabase() -> "AsyncClient":
+    """Return the shared async Supabase client, creating it on first use."""
+    global _async_supabase, _http_client
+    if _async_supabase is None:
+        async with _async_lock:
+            if _async_supabase is None:
+                from supabase import acreate_client, AsyncClientOptions
+                http_client = httpx.AsyncClient(
+                    follow_redirects=True,
+                    timeout=SUPABASE_TIMEOUT,
+                    transport=TimedTransport(httpx.AsyncHTTPTransport(
+                        http2=True,
+                        limits=httpx.Limits(
+                            max_connections=SUPABASE_MAX_CONNECTIONS,
+                            max_keepalive_connections=SUPABASE_MAX_KEEPALIVE,
+                        ),
+                    )),
+                )
+                try:
+                    client = await acreate_client(
+                        SUPABASE_URL,
+                        SUPABASE_KEY,
+                        options=AsyncClientOptions(httpx_client=http_client),
+                    )
+                except Exception:
+                    # e.g. SUPABASE_URL missing; don't leak a pool on every retry
+                    await http_client.aclose()
+                    raise
+                _http_client, _async_supabase = http_client, client
+    return _async_supabase
+
 
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
\ No newline at end of file
+async def close_async_supabase():
+    """Close the pooled connections behind the async client (called on shutdown)."""
+    global _async_supabase, _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+    _async_supabase = None
+    _http_client = None
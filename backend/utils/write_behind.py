@@ -0,0 +1,180 @@
+import asyncio
+import json
+import os
+import time
+from postgrest.exceptions import APIError
+from utils.supabase_client import get_async_supabase
+
+SPILL_DIR = os.path.join(os.path.dirname(__file__), "..", ".spill")
+
+# SQLSTATE classes the database will reject again on retry: data exceptions (22),
+# constraint violations (23) and undefined columns / bad syntax (42)
+REJECTED_SQLSTATE_CLASSES = ("22", "23", "42")
+
+
+def is_rejected(error: Exception) -> bool:
+    """True if the insert failed because of the rows themselves rather than the connection."""
+    code = getattr(error, "code", None) or ""
+    return isinstance(error, APIError) and (code[:2] in REJECTED_SQLSTATE_CLASSES or code == "PGRST204")
+
+
+class WriteBehindBuffer:
+    """
+    Queues rows for `table` in memory and inserts them in bulk every `flush_interval`
+    seconds or as soon as `max_rows` are waiting.
+
+    Every queued row is also appended to a local spill file, which is rewritten after
+    each successful flush to hold only the rows still pending. Rows left in the file
+    by a crash are replayed on the next start, so delivery is at-least-once.
+
+    A batch the database rejects (see `is_rejected`) is split in half until the
+    offending rows are isolated; those are appended to `dead_letter_path` and the
+    rest of the queue keeps draining. Any other error retries the batch next tick.
+    """
+
+    def __init__(self, table: str, spill_path: str, dead_letter_path: str = None, flush_interval: float = 0.2,
+                 max_rows: int = 500, fsync: bool = False):
+        self.table = table
+        self.spill_path = spill_path
+        self.dead_letter_path = dead_letter_path or os.path.splitext(spill_path)[0] + ".dead.jsonl"
+        self.flush_interval = flush_interval
+        self.max_rows = max_rows
+        self.fsync = fsync
+        self._pending = []  # (queued_at, row), oldest first
+        self._spill = None
+        self._wakeup = asyncio.Event()
+        self._task = None
+        self.flushed_rows = 0
+        self.flushes = 0
+        self.failed_flushes = 0
+        self.dead_lettered_rows = 0
+        self.last_flush_seconds = 0.0
+
+    async def start(self):
+        os.makedirs(os.path.dirname(self.spill_path), exist_ok=True)
+        if os.path.exists(self.spill_path):
+            with open(self.spill_path, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self._pending.append((entry["queued_at"], entry["row"]))
+            if self._pending:
+                print(f"Replaying {len(self._pending)} unflushed '{self.table}' rows from {self.spill_path}")
+        self._spill = open(self.spill_path, "a", encoding="utf-8")
+        self._task = asyncio.create_task(self._run())
+
+    def submit(self, row: dict):
+        queued_at = time.time()
+        self._spill.write(json.dumps({"queued_at": queued_at, "row": row}) + "\n")
+        self._spill.flush()
+        if self.fsync:
+            os.fsync(self._spill.fileno())
+        self._pending.append((queued_at, row))
+        if len(self._pending) >= self.max_rows:
+            self._wakeup.set()
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def flush(self) -> bool:
+        """Insert pending rows in batches of `max_rows`; returns False if a batch has to be retried."""
+        while self._pending:
+            pending = len(self._pending)
+            try:
+                await self._settle(self._pending[:self.max_rows])
+            except Exception as e:
+                self.failed_flushes += 1
+                print(f"Write-behind flush to '{self.table}' failed, will retry: {e}")
+                return False
+            finally:
+                if len(self._pending) != pending:
+                    self._rewrite_spill()
+        return True
+
+    async def _settle(self, batch: list):
+        """Insert `batch` (the head of the queue), dead-lettering rows the database rejects."""
+        start = time.perf_counter()
+        try:
+            supabase = await get_async_supabase()
+            await supabase.table(self.table).insert([row for _, row in batch]).execute()
+        except Exception as e:
+            if not is_rejected(e):
+                raise
+            if len(batch) == 1:
+                self._dead_letter(batch[0], e)
+            else:
+                middle = len(batch) // 2
+                await self._settle(batch[:middle])
+                await self._settle(batch[middle:])
+            return
+        self.last_flush_seconds = time.perf_counter() - start
+        self.flushes += 1
+        self.flushed_rows += len(batch)
+        # Submissions only ever append, so the settled batch is still the head
+        self._pending = self._pending[len(batch):]
+
+    def _dead_letter(self, entry: tuple, error: Exception):
+        queued_at, row = entry
+        with open(self.dead_letter_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"failed_at": time.time(), "queued_at": queued_at, "row": row, "error": str(error)}) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self.dead_lettered_rows += 1
+        print(f"Write-behind row for '{self.table}' rejected, moved to {self.dead_letter_path}: {error}")
+        self._pending = self._pending[1:]
+
+    def _rewrite_spill(self):
+        tmp_path = self.spill_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for queued_at, row in self._pending:
+                f.write(json.dumps({"queued_at": queued_at, "row": row}) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self._spill.close()
+        os.replace(tmp_path, self.spill_path)
+        self._spill = open(self.spill_path, "a", encoding="utf-8")
+
+    async def stop(self):
+        """Stop the flush loop and drain what is left; unflushed rows stay in the spill file."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        await self.flush()
+        self._spill.close()
+
+    def stats(self) -> dict:
+        return {
+            "pending": len(self._pending),
+            "flushed_rows": self.flushed_rows,
+            "flushes": self.flushes,
+            "failed_flushes": self.failed_flushes,
+            "dead_lettered_rows": self.dead_lettered_rows,
+            "last_flush_seconds": self.last_flush_seconds,
+            # Age of the oldest row not yet in the database
+            "flush_lag_seconds": time.time() - self._pending[0][0] if self._pending else 0.0,
+        }
+
+
+# Set ANALYTICS_WRITE_BEHIND=1 to acknowledge feedback submissions immediately and
+# insert them in bulk in the background.
+ANALYTICS_WRITE_BEHIND = os.getenv("ANALYTICS_WRITE_BEHIND", "0") == "1"
+
+analytics_buffer = WriteBehindBuffer(
+    "analytics",
+    spill_path=os.getenv("ANALYTICS_SPILL_PATH", os.path.join(SPILL_DIR, "analytics.jsonl")),
+    dead_letter_path=os.getenv("ANALYTICS_DEAD_LETTER_PATH"),
+    flush_interval=float(os.getenv("ANALYTICS_FLUSH_MS", "200")) / 1000,
+    max_rows=int(os.getenv("ANALYTICS_FLUSH_ROWS", "500")),
+    fsync=os.getenv("ANALYTICS_SPILL_FSYNC", "0") == "1",
+)